@@ -1,31 +1,49 @@
-from .api import exists, open_text, register_backend, resolve_uri
-from .cache import CacheConfig
-from .catalog import (
-    DEFAULT_BUCKET,
-    DEFAULT_PREFIX,
-    DEFAULT_SUFFIX,
-    DOC_FILENAMES,
-    FileEntry,
-    build_key,
-    get_documentation,
-    list_all_objects,
-    list_ancestries,
-    list_dataset_files,
-    list_datasets,
-    list_datasets_with_docs,
-    list_files,
-    list_files_with_metadata,
-    list_traits,
-    open_trait,
-    list_objects,
-)
-from .streams import iter_lines, iter_tsv_dicts
+from __future__ import annotations
+
+import importlib
+
+_EXPORTS = {
+    "open_text": ".api",
+    "open_binary": ".api",
+    "fetch_many": ".api",
+    "async_fetch_many": ".api",
+    "exists": ".api",
+    "resolve_uri": ".api",
+    "register_backend": ".api",
+    "refresh_env_config": ".api",
+    "CacheConfig": ".cache",
+    "DEFAULT_BUCKET": ".defaults",
+    "DEFAULT_PREFIX": ".defaults",
+    "DEFAULT_SUFFIX": ".defaults",
+    "DOC_FILENAMES": ".defaults",
+    "FileEntry": ".catalog",
+    "build_key": ".catalog",
+    "list_objects": ".catalog",
+    "list_all_objects": ".catalog",
+    "list_all_objects_parallel": ".catalog",
+    "list_ancestries": ".catalog",
+    "list_datasets": ".catalog",
+    "list_dataset_files": ".catalog",
+    "list_files": ".catalog",
+    "list_files_with_metadata": ".catalog",
+    "list_traits": ".catalog",
+    "open_trait": ".catalog",
+    "get_documentation": ".catalog",
+    "list_datasets_with_docs": ".catalog",
+    "iter_lines": ".streams",
+    "iter_tsv_dicts": ".streams",
+    "iter_tsv_records": ".streams",
+}
 
 __all__ = [
     "open_text",
+    "open_binary",
+    "fetch_many",
+    "async_fetch_many",
     "exists",
     "resolve_uri",
     "register_backend",
+    "refresh_env_config",
     "CacheConfig",
     "DEFAULT_BUCKET",
     "DEFAULT_PREFIX",
@@ -35,6 +53,7 @@ __all__ = [
     "build_key",
     "list_objects",
     "list_all_objects",
+    "list_all_objects_parallel",
     "list_ancestries",
     "list_datasets",
     "list_dataset_files",
@@ -46,4 +65,18 @@ __all__ = [
     "list_datasets_with_docs",
     "iter_lines",
     "iter_tsv_dicts",
+    "iter_tsv_records",
 ]
+
+
+def __getattr__(name: str):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
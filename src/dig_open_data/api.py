@@ -1,30 +1,81 @@
 from __future__ import annotations
 
-import urllib.parse
-from typing import BinaryIO, Dict
-
-from .backends import Backend, LocalBackend, S3HttpBackend
-from .cache import CacheConfig, CacheStore, cache_config_from_env
+import asyncio
+import functools
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import BinaryIO, Callable, Dict, Iterable
+
+from .backends import (
+    _POOL,
+    Backend,
+    LocalBackend,
+    S3HttpBackend,
+    _parse_uri,
+    _refresh_env as _refresh_backend_env,
+    _retry,
+)
+from .cache import CacheConfig, cache_config_from_env, get_cache_store
 import os
 import tempfile
 
-from .streams import open_text_stream, open_text_stream_with_retries
+from .streams import (
+    ResumableBinaryStream,
+    open_binary_stream,
+    open_decompressed_stream,
+    open_text_stream,
+    open_text_stream_with_retries,
+)
 
 _BACKENDS: Dict[str, Backend] = {}
+_DEFAULT_BACKENDS: Dict[str, Callable[[], Backend]] = {
+    "": LocalBackend,
+    "file": LocalBackend,
+    "s3": S3HttpBackend,
+}
+_BACKENDS_LOCK = threading.Lock()
+
+_HEAD_CACHE: Dict[tuple, tuple] = {}
+_HEAD_CACHE_MAXSIZE = 2048
+_HEAD_CACHE_LOCK = threading.Lock()
+
+_INFLIGHT: Dict[tuple, Future] = {}
+_INFLIGHT_LOCK = threading.Lock()
+
+_O_TMPFILE = getattr(os, "O_TMPFILE", None) if os.path.isdir("/proc/self/fd") else None
+
+_COPY_BUFFER_SIZE = 4 * 1024 * 1024
+_PIPELINE_DEPTH = 4
+_PIPELINE_THRESHOLD = 4 * _COPY_BUFFER_SIZE
+_RANGED_THRESHOLD = 32 * 1024 * 1024
+_RANGED_PART_SIZE = 8 * 1024 * 1024
+_RANGED_CONCURRENCY = 8
 
 
 def register_backend(backend: Backend) -> None:
-    for scheme in backend.schemes:
-        _BACKENDS[scheme] = backend
+    with _BACKENDS_LOCK:
+        for scheme in backend.schemes:
+            _BACKENDS[sys.intern(scheme)] = backend
+
+
+def refresh_env_config() -> None:
+    global _CACHE_FORCE, _HEAD_TTL_SECONDS
+    _CACHE_FORCE = _read_cache_force_env()
+    _HEAD_TTL_SECONDS = _read_head_ttl_env()
+    cache_config_from_env.cache_clear()
+    _refresh_backend_env()
 
 
 def resolve_uri(uri: str) -> str:
-    parsed = urllib.parse.urlparse(uri)
-    scheme = parsed.scheme
+    scheme = _uri_scheme(uri)
     if scheme == "registry":
+        parsed = _parse_uri(uri)
         return f"s3://{parsed.netloc}{parsed.path}"
     if scheme == "file":
-        return parsed.path
+        return _parse_uri(uri).path
     return uri
 
 
@@ -36,42 +87,119 @@ def open_text(
     download: bool = False,
     cache: CacheConfig | None = None,
     cache_refresh: bool = False,
+):
+    return _open(
+        uri,
+        lambda binary: open_text_stream(binary, encoding),
+        retries=retries,
+        download=download,
+        cache=cache,
+        cache_refresh=cache_refresh,
+    )
+
+
+def open_binary(
+    uri: str,
+    *,
+    retries: int = 3,
+    download: bool = False,
+    cache: CacheConfig | None = None,
+    cache_refresh: bool = False,
+    decompress: bool = False,
+):
+    return _open(
+        uri,
+        open_decompressed_stream if decompress else open_binary_stream,
+        retries=retries,
+        download=download,
+        cache=cache,
+        cache_refresh=cache_refresh,
+        binary=True,
+    )
+
+
+def _open(
+    uri: str,
+    wrap: Callable[[BinaryIO], object],
+    *,
+    retries: int,
+    download: bool,
+    cache: CacheConfig | None,
+    cache_refresh: bool,
+    binary: bool = False,
 ):
     resolved = resolve_uri(uri)
     backend = _select_backend(resolved)
 
     cache_config = cache or cache_config_from_env()
-    if _cache_force_env():
+    if _CACHE_FORCE:
         cache_refresh = True
 
     if cache_config is not None and _is_remote_uri(resolved):
-        return _open_text_cached(
+        return _open_cached(
             backend,
             resolved,
-            encoding=encoding,
+            wrap=wrap,
             retries=retries,
             cache_config=cache_config,
             cache_refresh=cache_refresh,
         )
 
     if download and _is_remote_uri(resolved):
-        return _open_text_downloaded(
+        return _open_downloaded(
             backend,
             resolved,
-            encoding=encoding,
+            wrap=wrap,
             retries=retries,
         )
 
-    def opener():
-        binary = backend.open_binary(resolved)
-        return open_text_stream(binary, encoding)
-
     if retries <= 0:
-        return opener()
+        return wrap(backend.open_binary(resolved))
+
+    ranged = getattr(backend, "supports_ranges", False)
+    if binary or ranged:
+        resume_from = (_range_opener if ranged else _restart_opener)(backend, resolved)
+        return wrap(ResumableBinaryStream(resume_from, retries))
+
+    def opener():
+        return wrap(backend.open_binary(resolved))
 
     return open_text_stream_with_retries(opener, retries=retries)
 
 
+def fetch_many(uris: Iterable[str], *, max_workers: int = 16, **open_text_kwargs) -> list:
+    uris = list(uris)
+    if not uris:
+        return []
+    workers = max(1, min(max_workers, len(uris), _POOL.maxsize))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(open_text, uri, **open_text_kwargs) for uri in uris]
+    handles = []
+    first_error: BaseException | None = None
+    for future in futures:
+        error = future.exception()
+        if error is not None:
+            first_error = first_error or error
+            continue
+        handles.append(future.result())
+    if first_error is not None:
+        for handle in handles:
+            try:
+                handle.close()
+            except Exception:
+                pass
+        raise first_error
+    return handles
+
+
+async def async_fetch_many(
+    uris: Iterable[str], *, max_workers: int = 16, **open_text_kwargs
+) -> list:
+    return await asyncio.to_thread(
+        fetch_many, list(uris), max_workers=max_workers, **open_text_kwargs
+    )
+
+
 def exists(uri: str) -> bool:
     resolved = resolve_uri(uri)
     backend = _select_backend(resolved)
@@ -79,86 +207,114 @@ def exists(uri: str) -> bool:
 
 
 def _select_backend(uri: str) -> Backend:
-    parsed = urllib.parse.urlparse(uri)
-    scheme = parsed.scheme
-    if scheme == "":
-        scheme = ""
-    backend = _BACKENDS.get(scheme)
+    scheme = _uri_scheme(uri)
+    backend = _get_backend(scheme)
     if backend is None:
         raise ValueError(f"No backend registered for scheme '{scheme}' in URI: {uri}")
     return backend
 
 
-register_backend(LocalBackend())
-register_backend(S3HttpBackend())
-
-
-def _open_text_downloaded(
+def _get_backend(scheme: str) -> Backend | None:
+    backend = _BACKENDS.get(scheme)
+    if backend is not None:
+        return backend
+    factory = _DEFAULT_BACKENDS.get(scheme)
+    if factory is None:
+        return None
+    with _BACKENDS_LOCK:
+        backend = _BACKENDS.get(scheme)
+        if backend is None:
+            backend = factory()
+            for default_scheme in backend.schemes:
+                _BACKENDS.setdefault(sys.intern(default_scheme), backend)
+    return _BACKENDS[scheme]
+
+
+def _open_downloaded(
     backend: Backend,
     uri: str,
     *,
-    encoding: str,
+    wrap: Callable[[BinaryIO], object],
     retries: int,
 ):
     tmp_path = _download_with_retries(backend, uri, retries=retries)
-    handle = open_text_stream(open(tmp_path, "rb"), encoding)
+    handle = wrap(open(tmp_path, "rb"))
     return _CleanupTextIO(handle, tmp_path)
 
 
-def _open_text_cached(
+def _open_cached(
     backend: Backend,
     uri: str,
     *,
-    encoding: str,
+    wrap: Callable[[BinaryIO], object],
     retries: int,
     cache_config: CacheConfig,
     cache_refresh: bool,
 ):
-    cache_store = CacheStore(cache_config)
+    cache_store = get_cache_store(cache_config)
     cached_entry = cache_store.get(uri)
+    fresh_response = None
+    if cache_refresh:
+        _forget_remote_metadata(backend, uri)
     if cached_entry is not None and not cache_refresh:
-        if _cache_entry_valid(backend, uri, cached_entry):
-            handle = open_text_stream(open(cached_entry["path"], "rb"), encoding)
-            return handle
-        cache_store.delete(uri)
-
-    tmp_path, size, metadata = _download_to_temp(
-        backend, uri, retries=retries, cache_dir=cache_store._objects_dir
-    )
-    cached_path = cache_store.put(uri, tmp_path, size, metadata=metadata)
-    handle = open_text_stream(open(cached_path, "rb"), encoding)
+        try:
+            cached_file = open(cached_entry["path"], "rb")
+        except FileNotFoundError:
+            cache_store.delete(uri)
+        else:
+            try:
+                valid, fresh_response = _revalidate(backend, uri, cached_entry)
+            except BaseException:
+                cached_file.close()
+                raise
+            if valid:
+                handle = wrap(cached_file)
+                return handle
+            cached_file.close()
+            _forget_remote_metadata(backend, uri)
+            cache_store.delete(uri)
+
+    inflight_key = (cache_store._dir, uri)
+    with _INFLIGHT_LOCK:
+        future = _INFLIGHT.get(inflight_key)
+        owner = future is None
+        if owner:
+            future = Future()
+            _INFLIGHT[inflight_key] = future
+    if not owner:
+        if fresh_response is not None:
+            fresh_response.close()
+        handle = wrap(open(future.result(), "rb"))
+        return handle
+
+    try:
+        download = None
+        if fresh_response is not None:
+            try:
+                with fresh_response:
+                    download = _stream_to_temp(fresh_response, cache_store._objects_dir)
+            except Exception:
+                download = None
+        if download is None:
+            download = _download_to_temp(
+                backend, uri, retries=retries, cache_dir=cache_store._objects_dir
+            )
+        tmp_path, size, metadata = download
+        cached_path = cache_store.put(uri, tmp_path, size, metadata=metadata)
+        future.set_result(cached_path)
+    except BaseException as exc:
+        future.set_exception(exc)
+        raise
+    finally:
+        with _INFLIGHT_LOCK:
+            _INFLIGHT.pop(inflight_key, None)
+    handle = wrap(open(cached_path, "rb"))
     return handle
 
 
 def _download_with_retries(backend: Backend, uri: str, *, retries: int) -> str:
-    attempts = max(0, retries)
-    last_error: Exception | None = None
-    for _ in range(attempts + 1):
-        try:
-            with backend.open_binary(uri) as response:
-                content_length = _get_content_length(response)
-                fd, path = tempfile.mkstemp(prefix="dig-open-data-", suffix=".tmp")
-                os.close(fd)
-                bytes_read = 0
-                with open(path, "wb") as out:
-                    while True:
-                        chunk = response.read(1024 * 1024)
-                        if not chunk:
-                            break
-                        out.write(chunk)
-                        bytes_read += len(chunk)
-                if content_length is not None and bytes_read < content_length:
-                    os.remove(path)
-                    raise OSError(
-                        f"Downloaded {bytes_read} bytes, expected {content_length}"
-                    )
-                return path
-        except Exception as exc:
-            last_error = exc
-            continue
-    if last_error:
-        raise last_error
-    raise RuntimeError("Failed to download resource")
+    path, _, _ = _download_to_temp(backend, uri, retries=retries)
+    return path
 
 
 def _download_to_temp(
@@ -168,42 +324,273 @@ def _download_to_temp(
     retries: int,
     cache_dir: str | None = None,
 ) -> tuple[str, int, dict]:
-    attempts = max(0, retries)
-    last_error: Exception | None = None
-    for _ in range(attempts + 1):
+    return _retry(lambda: _download_once(backend, uri, cache_dir), retries=retries)
+
+
+def _download_once(
+    backend: Backend, uri: str, cache_dir: str | None
+) -> tuple[str, int, dict]:
+    with backend.open_binary(uri) as response:
+        size = _get_content_length(response)
+        if not _use_ranged_download(backend, size):
+            return _stream_to_temp(response, cache_dir)
+        metadata = _get_response_metadata(response)
+        metadata["content_length"] = size
+        path, _ = _write_temp(
+            cache_dir, lambda fd: _download_ranged(backend, uri, fd, size, first=response)
+        )
+        return path, size, metadata
+
+
+def _stream_to_temp(response, cache_dir: str | None) -> tuple[str, int, dict]:
+    content_length = _get_content_length(response)
+    path, bytes_read = _write_temp(
+        cache_dir, lambda fd: _copy_to_fd(response, fd, content_length)
+    )
+    metadata = _get_response_metadata(response)
+    if content_length is not None:
+        metadata["content_length"] = content_length
+    return path, bytes_read, metadata
+
+
+def _copy_to_fd(response, fd: int, content_length: int | None) -> int:
+    if content_length:
+        _preallocate(fd, content_length)
+    with open(fd, "wb", buffering=0, closefd=False) as out:
+        readinto = getattr(response, "readinto", None)
+        if readinto is not None and (content_length or 0) >= _PIPELINE_THRESHOLD:
+            bytes_read = _copy_stream_pipelined(readinto, out)
+        else:
+            bytes_read = _copy_stream(response, out)
+    if content_length is not None and bytes_read < content_length:
+        raise OSError(f"Downloaded {bytes_read} bytes, expected {content_length}")
+    return bytes_read
+
+
+def _copy_stream(response, out) -> int:
+    readinto = getattr(response, "readinto", None)
+    if readinto is None:
+        total = 0
+        while True:
+            chunk = response.read(_COPY_BUFFER_SIZE)
+            if not chunk:
+                return total
+            _write_all(out, chunk)
+            total += len(chunk)
+    buffer = bytearray(_COPY_BUFFER_SIZE)
+    view = memoryview(buffer)
+    total = 0
+    while True:
+        count = readinto(view)
+        if not count:
+            return total
+        _write_all(out, view[:count])
+        total += count
+
+
+def _copy_stream_pipelined(readinto, out) -> int:
+    free: queue.Queue = queue.Queue()
+    filled: queue.Queue = queue.Queue()
+    for _ in range(_PIPELINE_DEPTH):
+        free.put(bytearray(_COPY_BUFFER_SIZE))
+    errors: list[BaseException] = []
+
+    def writer() -> None:
         try:
-            with backend.open_binary(uri) as response:
-                content_length = _get_content_length(response)
-                if cache_dir:
-                    fd, path = tempfile.mkstemp(
-                        prefix="dig-open-data-", suffix=".partial", dir=cache_dir
-                    )
-                else:
-                    fd, path = tempfile.mkstemp(prefix="dig-open-data-", suffix=".tmp")
-                os.close(fd)
-                bytes_read = 0
-                with open(path, "wb") as out:
-                    while True:
-                        chunk = response.read(1024 * 1024)
-                        if not chunk:
-                            break
-                        out.write(chunk)
-                        bytes_read += len(chunk)
-                if content_length is not None and bytes_read < content_length:
-                    os.remove(path)
-                    raise OSError(
-                        f"Downloaded {bytes_read} bytes, expected {content_length}"
-                    )
-                metadata = _get_response_metadata(response)
-                if content_length is not None:
-                    metadata["content_length"] = content_length
-                return path, bytes_read, metadata
-        except Exception as exc:
-            last_error = exc
+            while True:
+                item = filled.get()
+                if item is None:
+                    return
+                buffer, count = item
+                _write_all(out, memoryview(buffer)[:count])
+                free.put(buffer)
+        except BaseException as exc:
+            errors.append(exc)
+            free.put(None)
+
+    thread = threading.Thread(target=writer, name="dig-open-data-writer", daemon=True)
+    thread.start()
+    total = 0
+    try:
+        while not errors:
+            buffer = free.get()
+            if buffer is None:
+                break
+            count = readinto(buffer)
+            if not count:
+                break
+            filled.put((buffer, count))
+            total += count
+    finally:
+        filled.put(None)
+        thread.join()
+    if errors:
+        raise errors[0]
+    return total
+
+
+def _write_all(out, data) -> None:
+    view = memoryview(data)
+    while view:
+        written = out.write(view)
+        view = view[written:]
+
+
+def _preallocate(fd: int, size: int) -> None:
+    if hasattr(os, "posix_fallocate"):
+        try:
+            os.posix_fallocate(fd, 0, size)
+            return
+        except OSError:
+            pass
+    os.ftruncate(fd, size)
+
+
+def _write_temp(cache_dir: str | None, write: Callable[[int], int | None]):
+    directory = cache_dir or tempfile.gettempdir()
+    suffix = ".partial" if cache_dir else ".tmp"
+    fd, path = _open_temp(directory, suffix)
+    try:
+        written = write(fd)
+        if path is None:
+            path = _link_temp(fd, directory, suffix)
+    except BaseException:
+        os.close(fd)
+        if path is not None:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        raise
+    os.close(fd)
+    return path, written
+
+
+def _open_temp(directory: str, suffix: str) -> tuple[int, str | None]:
+    if _tmpfile_supported(directory):
+        try:
+            return os.open(directory, _O_TMPFILE | os.O_WRONLY, 0o600), None
+        except OSError:
+            pass
+    return tempfile.mkstemp(prefix="dig-open-data-", suffix=suffix, dir=directory)
+
+
+@functools.lru_cache(maxsize=None)
+def _tmpfile_supported(directory: str) -> bool:
+    if _O_TMPFILE is None:
+        return False
+    try:
+        fd = os.open(directory, _O_TMPFILE | os.O_WRONLY, 0o600)
+    except OSError:
+        return False
+    try:
+        path = _link_temp(fd, directory, ".probe")
+    except OSError:
+        return False
+    finally:
+        os.close(fd)
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+    return True
+
+
+def _link_temp(fd: int, directory: str, suffix: str) -> str:
+    while True:
+        path = os.path.join(directory, f"dig-open-data-{os.urandom(8).hex()}{suffix}")
+        try:
+            os.link(f"/proc/self/fd/{fd}", path)
+            return path
+        except FileExistsError:
             continue
-    if last_error:
-        raise last_error
-    raise RuntimeError("Failed to download resource")
+
+
+def _use_ranged_download(backend: Backend, size: int | None) -> bool:
+    if not getattr(backend, "supports_ranges", False) or not hasattr(os, "pwrite"):
+        return False
+    return size is not None and size > _RANGED_THRESHOLD
+
+
+def _download_ranged(
+    backend: Backend,
+    uri: str,
+    fd: int,
+    size: int,
+    *,
+    part_size: int | None = None,
+    concurrency: int | None = None,
+    first=None,
+) -> None:
+    part_size = part_size or _RANGED_PART_SIZE
+    concurrency = concurrency or _RANGED_CONCURRENCY
+    _preallocate(fd, size)
+    ranges = [
+        (start, min(start + part_size, size) - 1) for start in range(0, size, part_size)
+    ]
+    if first is not None:
+        first_range, ranges = ranges[0], ranges[1:]
+    workers = max(1, min(concurrency, len(ranges), _POOL.maxsize))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(_fetch_range, backend, uri, fd, start, end)
+            for start, end in ranges
+        ]
+        if first is not None:
+            _copy_range(first, uri, fd, *first_range)
+    for future in futures:
+        future.result()
+
+
+def _range_opener(backend: Backend, uri: str) -> Callable[[int], BinaryIO]:
+    def open_from(offset: int) -> BinaryIO:
+        if offset <= 0:
+            return backend.open_binary(uri)
+        response = backend.open_binary(uri, headers={"Range": f"bytes={offset}-"})
+        if getattr(response, "status", 206) != 206:
+            response.close()
+            raise OSError(f"Range request not honoured for {uri}")
+        return response
+
+    return open_from
+
+
+def _restart_opener(backend: Backend, uri: str) -> Callable[[int], BinaryIO]:
+    def open_from(offset: int) -> BinaryIO:
+        response = backend.open_binary(uri)
+        remaining = offset
+        while remaining > 0:
+            skipped = len(response.read(min(remaining, 1024 * 1024)))
+            if not skipped:
+                response.close()
+                raise EOFError(f"Stream for {uri} ended before retry offset {offset}")
+            remaining -= skipped
+        return response
+
+    return open_from
+
+
+def _fetch_range(backend: Backend, uri: str, fd: int, start: int, end: int) -> None:
+    headers = {"Range": f"bytes={start}-{end}"}
+    with backend.open_binary(uri, headers=headers) as response:
+        if getattr(response, "status", 206) != 206:
+            raise OSError(f"Range request not honoured for {uri}")
+        _copy_range(response, uri, fd, start, end)
+
+
+def _copy_range(response, uri: str, fd: int, start: int, end: int) -> None:
+    offset = start
+    while offset <= end:
+        chunk = response.read(min(1024 * 1024, end + 1 - offset))
+        if not chunk:
+            break
+        view = memoryview(chunk)
+        while view:
+            written = os.pwrite(fd, view, offset)
+            offset += written
+            view = view[written:]
+    if offset != end + 1:
+        raise OSError(f"Downloaded {offset - start} bytes from {uri}, expected {end - start + 1}")
 
 
 def _get_content_length(response) -> int | None:
@@ -235,10 +622,40 @@ def _get_response_metadata(response) -> dict:
     return metadata
 
 
+def _revalidate(backend: Backend, uri: str, entry: dict):
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = f"\"{entry['etag']}\""
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    if not headers or not getattr(backend, "supports_conditional_get", False):
+        return _cache_entry_valid(backend, uri, entry), None
+    meta = _recent_remote_metadata(backend, uri)
+    if meta is not None:
+        return _metadata_matches(entry, meta), None
+    try:
+        response = backend.open_binary(uri, headers=headers)
+    except Exception:
+        return True, None
+    if getattr(response, "status", 200) == 304:
+        response.close()
+        _remember_remote_metadata(
+            backend,
+            uri,
+            {name: entry[name] for name in ("etag", "last_modified") if entry.get(name)},
+        )
+        return True, None
+    return False, response
+
+
 def _cache_entry_valid(backend: Backend, uri: str, entry: dict) -> bool:
-    meta = _remote_metadata(backend, uri)
+    meta = _cached_remote_metadata(backend, uri)
     if not meta:
         return True
+    return _metadata_matches(entry, meta)
+
+
+def _metadata_matches(entry: dict, meta: dict) -> bool:
     etag = entry.get("etag")
     if etag and meta.get("etag") and etag != meta.get("etag"):
         return False
@@ -260,14 +677,76 @@ def _remote_metadata(backend: Backend, uri: str) -> dict:
     return {}
 
 
-def _cache_force_env() -> bool:
+def _cached_remote_metadata(backend: Backend, uri: str) -> dict:
+    if _HEAD_TTL_SECONDS <= 0:
+        return _remote_metadata(backend, uri)
+    meta = _recent_remote_metadata(backend, uri)
+    if meta is not None:
+        return meta
+    meta = _remote_metadata(backend, uri)
+    _remember_remote_metadata(backend, uri, meta)
+    return meta
+
+
+def _recent_remote_metadata(backend: Backend, uri: str) -> dict | None:
+    ttl = _HEAD_TTL_SECONDS
+    if ttl <= 0:
+        return None
+    with _HEAD_CACHE_LOCK:
+        cached = _HEAD_CACHE.get((id(backend), uri))
+    if cached is not None and cached[0] is backend and time.monotonic() - cached[1] < ttl:
+        return cached[2]
+    return None
+
+
+def _remember_remote_metadata(backend: Backend, uri: str, meta: dict) -> None:
+    if not meta or _HEAD_TTL_SECONDS <= 0:
+        return
+    key = (id(backend), uri)
+    with _HEAD_CACHE_LOCK:
+        _HEAD_CACHE.pop(key, None)
+        _HEAD_CACHE[key] = (backend, time.monotonic(), meta)
+        while len(_HEAD_CACHE) > _HEAD_CACHE_MAXSIZE:
+            del _HEAD_CACHE[next(iter(_HEAD_CACHE))]
+
+
+def _forget_remote_metadata(backend: Backend, uri: str) -> None:
+    with _HEAD_CACHE_LOCK:
+        _HEAD_CACHE.pop((id(backend), uri), None)
+
+
+def _read_head_ttl_env() -> float:
+    value = os.environ.get("DIG_OPEN_DATA_HEAD_TTL_SECONDS", "")
+    if not value:
+        return 60.0
+    try:
+        return float(value)
+    except ValueError:
+        return 60.0
+
+
+def _read_cache_force_env() -> bool:
     value = os.environ.get("DIG_OPEN_DATA_CACHE_FORCE", "")
     return value.lower() in {"1", "true", "yes"}
 
 
+_CACHE_FORCE = _read_cache_force_env()
+_HEAD_TTL_SECONDS = _read_head_ttl_env()
+
+
 def _is_remote_uri(uri: str) -> bool:
-    parsed = urllib.parse.urlparse(uri)
-    return parsed.scheme not in ("", "file")
+    return _uri_scheme(uri) not in ("", "file")
+
+
+def _uri_scheme(uri: str) -> str:
+    index = uri.find("://")
+    if index > 0:
+        scheme = uri[:index]
+        if scheme.isascii() and scheme.isalnum() and scheme[0].isalpha():
+            return scheme.lower()
+    elif ":" not in uri:
+        return ""
+    return _parse_uri(uri).scheme
 
 
 class _CleanupTextIO:
@@ -291,5 +770,36 @@ class _CleanupTextIO:
     def __exit__(self, exc_type, exc, tb):
         self.close()
 
+    def __iter__(self):
+        return iter(self._inner)
+
+    def __next__(self):
+        return self._inner.__next__()
+
+    def read(self, *args, **kwargs):
+        return self._inner.read(*args, **kwargs)
+
+    def readline(self, *args, **kwargs):
+        return self._inner.readline(*args, **kwargs)
+
+    def readlines(self, *args, **kwargs):
+        return self._inner.readlines(*args, **kwargs)
+
+    def readable(self):
+        return self._inner.readable()
+
+    def seekable(self):
+        return self._inner.seekable()
+
+    def writable(self):
+        return self._inner.writable()
+
+    def flush(self):
+        return self._inner.flush()
+
+    @property
+    def closed(self) -> bool:
+        return self._inner.closed
+
     def __getattr__(self, name):
         return getattr(self._inner, name)
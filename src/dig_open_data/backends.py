@@ -1,11 +1,36 @@
 from __future__ import annotations
 
+import functools
+import http.client
+import io
 import os
-import os
+import string
+import threading
 import time
+import urllib.error
 import urllib.parse
 import urllib.request
-from typing import BinaryIO, Protocol
+from typing import BinaryIO, Callable, Protocol, TypeVar
+
+T = TypeVar("T")
+
+_DEFAULT_HEADERS = {
+    "User-Agent": "dig-open-data/0.1",
+    "Accept-Encoding": "identity",
+}
+_RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+_URL_SAFE_CHARS = frozenset(string.ascii_letters + string.digits + "-_.~/")
+_S3_DEBUG = os.environ.get("DIG_OPEN_DATA_S3_DEBUG") == "1"
+
+
+def _refresh_env() -> None:
+    global _S3_DEBUG
+    _S3_DEBUG = os.environ.get("DIG_OPEN_DATA_S3_DEBUG") == "1"
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_uri(uri: str) -> urllib.parse.ParseResult:
+    return urllib.parse.urlparse(uri)
 
 
 class Backend(Protocol):
@@ -50,7 +75,11 @@ class LocalBackend:
 
     @staticmethod
     def _uri_to_path(uri: str) -> str:
-        parsed = urllib.parse.urlparse(uri)
+        if "%" not in uri and (uri[:1] == "/" or ":" not in uri):
+            if uri[:1] == "~":
+                return os.path.expanduser(uri)
+            return uri
+        parsed = _parse_uri(uri)
         if parsed.scheme in ("", "file"):
             path = parsed.path if parsed.scheme == "file" else uri
             path = urllib.parse.unquote(path)
@@ -60,44 +89,40 @@ class LocalBackend:
 
 class S3HttpBackend:
     schemes = {"s3"}
+    supports_ranges = True
+    supports_conditional_get = True
 
     def __init__(self, *, retries: int = 2, backoff: float = 0.5) -> None:
         self._retries = max(0, retries)
         self._backoff = max(0.0, backoff)
+        self._bucket_endpoint: dict[str, str] = {}
 
-    def open_binary(self, uri: str) -> BinaryIO:
-        urls = s3_uri_to_https_urls(uri)
+    def open_binary(self, uri: str, *, headers: dict | None = None) -> BinaryIO:
+        bucket, quoted_key = _split_s3_uri(uri)
         last_error: Exception | None = None
-        for url in urls:
-            for attempt in range(self._retries + 1):
-                request = urllib.request.Request(
-                    url,
-                    method="GET",
-                    headers={
-                        "User-Agent": "dig-open-data/0.1",
-                        "Accept-Encoding": "identity",
-                    },
+        for url in self._candidate_urls(bucket, quoted_key):
+            try:
+                response = _retry(
+                    lambda: _POOL.request("GET", url, headers=headers, timeout=60),
+                    retries=self._retries,
+                    backoff=self._backoff,
+                    transient=(urllib.error.URLError,),
+                    should_retry=_is_transient_http_error,
                 )
-                try:
-                    return urllib.request.urlopen(request, timeout=60)
-                except urllib.error.HTTPError as exc:
-                    if exc.code == 404:
-                        raise FileNotFoundError(
-                            f"S3 object not found: {uri} (resolved {url})"
-                        ) from exc
-                    last_error = exc
-                    _maybe_debug(uri, url, exc)
-                    if attempt < self._retries and exc.code in {429, 500, 502, 503, 504}:
-                        time.sleep(self._backoff * (2**attempt))
-                        continue
-                    break
-                except urllib.error.URLError as exc:
-                    last_error = exc
-                    _maybe_debug(uri, url, exc)
-                    if attempt < self._retries:
-                        time.sleep(self._backoff * (2**attempt))
-                        continue
-                    break
+            except urllib.error.HTTPError as exc:
+                if exc.code == 404:
+                    raise FileNotFoundError(
+                        f"S3 object not found: {uri} (resolved {url})"
+                    ) from exc
+                last_error = exc
+                _maybe_debug(uri, url, exc)
+                continue
+            except urllib.error.URLError as exc:
+                last_error = exc
+                _maybe_debug(uri, url, exc)
+                continue
+            self._remember_endpoint(bucket, quoted_key, getattr(response, "url", url))
+            return response
         if isinstance(last_error, urllib.error.HTTPError):
             raise RuntimeError(
                 f"S3 request failed: {uri} status={last_error.code} reason={last_error.reason}"
@@ -105,19 +130,12 @@ class S3HttpBackend:
         raise RuntimeError(f"S3 request failed: {uri}") from last_error
 
     def exists(self, uri: str) -> bool:
-        urls = s3_uri_to_https_urls(uri)
+        bucket, quoted_key = _split_s3_uri(uri)
         last_error: Exception | None = None
-        for url in urls:
-            request = urllib.request.Request(
-                url,
-                method="HEAD",
-                headers={
-                    "User-Agent": "dig-open-data/0.1",
-                    "Accept-Encoding": "identity",
-                },
-            )
+        for url in self._candidate_urls(bucket, quoted_key):
             try:
-                with urllib.request.urlopen(request, timeout=30) as response:
+                with _POOL.request("HEAD", url, timeout=30) as response:
+                    self._remember_endpoint(bucket, quoted_key, getattr(response, "url", url))
                     return response.status == 200
             except urllib.error.HTTPError as exc:
                 if exc.code == 404:
@@ -136,19 +154,12 @@ class S3HttpBackend:
         raise RuntimeError(f"S3 request failed: {uri}") from last_error
 
     def head_metadata(self, uri: str) -> dict:
-        urls = s3_uri_to_https_urls(uri)
+        bucket, quoted_key = _split_s3_uri(uri)
         last_error: Exception | None = None
-        for url in urls:
-            request = urllib.request.Request(
-                url,
-                method="HEAD",
-                headers={
-                    "User-Agent": "dig-open-data/0.1",
-                    "Accept-Encoding": "identity",
-                },
-            )
+        for url in self._candidate_urls(bucket, quoted_key):
             try:
-                with urllib.request.urlopen(request, timeout=30) as response:
+                with _POOL.request("HEAD", url, timeout=30) as response:
+                    self._remember_endpoint(bucket, quoted_key, getattr(response, "url", url))
                     return _headers_to_metadata(response)
             except urllib.error.HTTPError as exc:
                 last_error = exc
@@ -160,31 +171,79 @@ class S3HttpBackend:
             raise last_error
         return {}
 
+    def _candidate_urls(self, bucket: str, quoted_key: str) -> list[str]:
+        bases = _endpoint_bases(bucket)
+        preferred = self._bucket_endpoint.get(bucket)
+        if preferred is not None:
+            bases = (preferred,) + tuple(base for base in bases if base != preferred)
+        return [base + quoted_key for base in bases]
+
+    def _remember_endpoint(self, bucket: str, quoted_key: str, url: str) -> None:
+        if not url.endswith(quoted_key):
+            return
+        base = url[: len(url) - len(quoted_key)]
+        if self._bucket_endpoint.get(bucket) != base:
+            self._bucket_endpoint[bucket] = base
+
+
+def _retry(
+    fn: Callable[[], T],
+    *,
+    retries: int,
+    backoff: float = 0.0,
+    transient: tuple[type[BaseException], ...] = (Exception,),
+    should_retry: Callable[[BaseException], bool] | None = None,
+) -> T:
+    attempts = max(0, retries)
+    for attempt in range(attempts + 1):
+        try:
+            return fn()
+        except transient as exc:
+            if attempt >= attempts or (should_retry is not None and not should_retry(exc)):
+                raise
+            if backoff:
+                time.sleep(backoff * (2**attempt))
+    raise AssertionError("unreachable")
+
+
+def _is_transient_http_error(exc: BaseException) -> bool:
+    if isinstance(exc, urllib.error.HTTPError):
+        return exc.code in _RETRY_STATUS_CODES
+    return True
+
 
 def s3_uri_to_https_url(uri: str) -> str:
-    return s3_uri_to_https_urls(uri)[0]
+    return _s3_https_urls(uri)[0]
 
 
 def s3_uri_to_https_urls(uri: str) -> list[str]:
-    parsed = urllib.parse.urlparse(uri)
+    return list(_s3_https_urls(uri))
+
+
+def _s3_https_urls(uri: str) -> tuple[str, ...]:
+    bucket, quoted_key = _split_s3_uri(uri)
+    return tuple(base + quoted_key for base in _endpoint_bases(bucket))
+
+
+@functools.lru_cache(maxsize=8192)
+def _split_s3_uri(uri: str) -> tuple[str, str]:
+    parsed = _parse_uri(uri)
     if parsed.scheme != "s3":
         raise ValueError(f"Expected s3:// URI, got: {uri}")
-    bucket = parsed.netloc
     key = parsed.path.lstrip("/")
-    quoted_key = urllib.parse.quote(key, safe="/")
-    if quoted_key:
-        return [
-            f"https://{bucket}.s3.amazonaws.com/{quoted_key}",
-            f"https://s3.amazonaws.com/{bucket}/{quoted_key}",
-            f"https://{bucket}.s3.us-east-1.amazonaws.com/{quoted_key}",
-            f"https://s3.us-east-1.amazonaws.com/{bucket}/{quoted_key}",
-        ]
-    return [
+    if _URL_SAFE_CHARS.issuperset(key):
+        return parsed.netloc, key
+    return parsed.netloc, urllib.parse.quote(key, safe="/")
+
+
+@functools.lru_cache(maxsize=256)
+def _endpoint_bases(bucket: str) -> tuple[str, ...]:
+    return (
         f"https://{bucket}.s3.amazonaws.com/",
         f"https://s3.amazonaws.com/{bucket}/",
         f"https://{bucket}.s3.us-east-1.amazonaws.com/",
         f"https://s3.us-east-1.amazonaws.com/{bucket}/",
-    ]
+    )
 
 
 def _headers_to_metadata(response) -> dict:
@@ -208,9 +267,188 @@ def _headers_to_metadata(response) -> dict:
 
 
 def _maybe_debug(uri: str, url: str, exc: Exception) -> None:
-    if os.environ.get("DIG_OPEN_DATA_S3_DEBUG") != "1":
+    if not _S3_DEBUG:
         return
     try:
         print(f"[dig-open-data] S3 error for {uri} -> {url}: {exc}", file=os.sys.stderr)
     except Exception:
         pass
+
+
+class _PooledResponse(io.RawIOBase):
+    def __init__(self, pool: "_HttpPool", key: tuple, conn, response, url: str) -> None:
+        self._pool = pool
+        self._key = key
+        self._conn = conn
+        self._response = response
+        self.url = url
+
+    @property
+    def status(self) -> int:
+        return self._response.status
+
+    @property
+    def reason(self) -> str:
+        return self._response.reason
+
+    @property
+    def headers(self):
+        return self._response.headers
+
+    @property
+    def length(self) -> int | None:
+        return self._response.length
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        return self._response.readinto(buffer)
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            return self._response.read()
+        return self._response.read(size)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        response = self._response
+        # Only reuse the socket if the body was fully consumed; otherwise
+        # unread bytes would corrupt the next response on this connection.
+        # A body cut short also leaves the response closed, but with length left.
+        reusable = not response.will_close and (
+            response.length == 0 or (response.length is None and response.isclosed())
+        )
+        try:
+            response.close()
+        finally:
+            if reusable:
+                self._pool.release(self._key, self._conn)
+            else:
+                self._conn.close()
+            super().close()
+
+
+class _HttpPool:
+    def __init__(self, *, maxsize: int = 32, headers: dict | None = None) -> None:
+        self._maxsize = maxsize
+        self._headers = dict(headers or {})
+        self._idle: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: dict | None = None,
+        timeout: float = 60,
+    ) -> _PooledResponse:
+        merged = dict(self._headers)
+        if headers:
+            merged.update(headers)
+        for _ in range(_MAX_REDIRECTS + 1):
+            key, conn, response = self._send(method, url, merged, timeout)
+            if response.status in _REDIRECT_CODES:
+                location = response.headers.get("Location")
+                response.read()
+                self._finish(key, conn, response)
+                if not location:
+                    raise urllib.error.HTTPError(
+                        url, response.status, response.reason, response.headers, None
+                    )
+                url = urllib.parse.urljoin(url, location)
+                if response.status == 303:
+                    method = "GET"
+                continue
+            if response.status >= 400:
+                body = response.read()
+                self._finish(key, conn, response)
+                raise urllib.error.HTTPError(
+                    url, response.status, response.reason, response.headers, io.BytesIO(body)
+                )
+            return _PooledResponse(self, key, conn, response, url)
+        raise urllib.error.HTTPError(
+            url, response.status, "Too many redirects", response.headers, None
+        )
+
+    def _send(self, method: str, url: str, headers: dict, timeout: float):
+        parsed = urllib.parse.urlsplit(url)
+        key = (parsed.scheme, parsed.hostname, parsed.port)
+        path = parsed.path or "/"
+        if parsed.query:
+            path = f"{path}?{parsed.query}"
+
+        conn, reused = self._acquire(key, timeout)
+        try:
+            try:
+                conn.request(method, path, headers=headers)
+                response = conn.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionError, BrokenPipeError):
+                if not reused:
+                    raise
+                # The server dropped an idle keep-alive socket; retry once fresh.
+                conn.close()
+                conn = self._new_connection(key, timeout)
+                conn.request(method, path, headers=headers)
+                response = conn.getresponse()
+        except (OSError, http.client.HTTPException) as exc:
+            conn.close()
+            raise urllib.error.URLError(exc) from exc
+        return key, conn, response
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    def release(self, key: tuple, conn) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self._maxsize:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def clear(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+    def _acquire(self, key: tuple, timeout: float):
+        with self._lock:
+            idle = self._idle.get(key)
+            conn = idle.pop() if idle else None
+        if conn is None:
+            return self._new_connection(key, timeout), False
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        return conn, True
+
+    def _finish(self, key: tuple, conn, response) -> None:
+        if response.will_close:
+            conn.close()
+        else:
+            self.release(key, conn)
+
+    @staticmethod
+    def _new_connection(key: tuple, timeout: float):
+        scheme, host, port = key
+        conn_class = (
+            http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        )
+        proxy = urllib.request.getproxies().get(scheme)
+        if proxy and not urllib.request.proxy_bypass(host):
+            proxy_parts = urllib.parse.urlsplit(proxy)
+            conn = conn_class(proxy_parts.hostname, proxy_parts.port, timeout=timeout)
+            conn.set_tunnel(host, port)
+            return conn
+        return conn_class(host, port, timeout=timeout)
+
+
+_MAX_REDIRECTS = 5
+_REDIRECT_CODES = frozenset({301, 302, 303, 307, 308})
+_POOL = _HttpPool(maxsize=32, headers=_DEFAULT_HEADERS)
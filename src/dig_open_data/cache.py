@@ -1,13 +1,23 @@
 from __future__ import annotations
 
+import atexit
 import json
 import os
-import tempfile
+import re
+import sqlite3
+import threading
 import time
+from contextlib import contextmanager
 from dataclasses import dataclass
-from hashlib import sha256
+from functools import lru_cache
+from hashlib import blake2b
 from typing import Iterable
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 
 @dataclass(frozen=True)
 class CacheConfig:
@@ -22,132 +32,357 @@ class CacheConfig:
         return int(self.ttl_days * 24 * 60 * 60)
 
 
+_INDEX_LOCK = threading.RLock()
+_STORES: dict[CacheConfig, "CacheStore"] = {}
+
+if orjson is not None:
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj: dict) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+
+else:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
+
+_SIZE_RE = re.compile(r"^\s*(\d+)\s*((?:[KMGT]i?)?B?)\s*$", re.IGNORECASE)
+_SIZE_UNITS = {"": 1, "B": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+_TOUCH_FLUSH_SECONDS = 5.0
+_EVICT_BATCH = 64
+_ENTRY_FIELDS = ("path", "size", "created_at", "last_access")
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS entries (
+        key TEXT PRIMARY KEY,
+        path TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        created_at INTEGER NOT NULL,
+        last_access REAL NOT NULL,
+        metadata TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)",
+    """
+    CREATE TABLE IF NOT EXISTS meta (
+        id INTEGER PRIMARY KEY CHECK (id = 0),
+        total_size INTEGER NOT NULL
+    )
+    """,
+    """
+    INSERT INTO meta SELECT 0, (SELECT COALESCE(SUM(size), 0) FROM entries)
+    WHERE NOT EXISTS (SELECT 1 FROM meta)
+    """,
+)
+
+
 class CacheStore:
     def __init__(self, config: CacheConfig) -> None:
         self._config = config
         self._dir = os.path.abspath(config.dir)
         self._objects_dir = os.path.join(self._dir, "objects")
-        self._index_path = os.path.join(self._dir, "index.jsonl")
+        self._index_path = os.path.join(self._dir, "index.sqlite3")
+        self._pending_touches: dict[str, float] = {}
+        self._staged: list[tuple[str, dict]] = []
+        self._last_flush = 0.0
         os.makedirs(self._objects_dir, exist_ok=True)
+        self._db = self._connect()
+        self._migrate_jsonl_index()
         self._cleanup_partials()
 
     def get(self, key: str) -> dict | None:
-        entry = self._load_index().get(key)
-        if entry is None:
-            return None
-        path = entry.get("path")
-        if not path or not os.path.exists(path):
-            self._delete_entry(key, entry)
-            return None
-        if self._expired(entry):
-            self._delete_entry(key, entry)
-            return None
-        self._touch(key, entry)
-        return entry
+        with _INDEX_LOCK:
+            row = self._db.execute(
+                "SELECT path, size, created_at, last_access, metadata FROM entries WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            entry = _row_to_entry(row)
+            if key in self._pending_touches:
+                entry["last_access"] = self._pending_touches[key]
+            if not entry["path"]:
+                self._delete_entry(key, entry)
+                return None
+            if self._expired(entry):
+                self._delete_entry(key, entry)
+                return None
+            self._touch(key, entry)
+            return entry
 
-    def put(self, key: str, source_path: str, size: int, metadata: dict | None = None) -> str:
-        digest = sha256(key.encode("utf-8")).hexdigest()
-        dest_path = os.path.join(self._objects_dir, digest)
-        os.replace(source_path, dest_path)
-        now = int(time.time())
+    def put(
+        self,
+        key: str,
+        source_path: str,
+        size: int,
+        metadata: dict | None = None,
+        *,
+        defer_commit: bool = False,
+    ) -> str:
+        with _INDEX_LOCK:
+            dest_path, entry = self._prepare_entry(key, source_path, size, metadata)
+            if defer_commit:
+                self._staged.append((key, entry))
+            else:
+                self._commit([(key, entry)])
+        return dest_path
+
+    def put_many(self, items: Iterable[tuple[str, str, int, dict | None]]) -> list[str]:
+        paths = []
+        records = []
+        with _INDEX_LOCK:
+            for key, source_path, size, metadata in items:
+                dest_path, entry = self._prepare_entry(key, source_path, size, metadata)
+                paths.append(dest_path)
+                records.append((key, entry))
+            self._commit(records)
+        return paths
+
+    def commit(self) -> None:
+        with _INDEX_LOCK:
+            staged, self._staged = self._staged, []
+            self._commit(staged)
+
+    def delete(self, key: str) -> None:
+        with _INDEX_LOCK:
+            row = self._db.execute(
+                "SELECT path, size FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                self._delete_entry(key, {"path": row[0], "size": row[1]})
+
+    def flush(self) -> None:
+        with _INDEX_LOCK:
+            self.commit()
+            self._flush_touches()
+
+    def _prepare_entry(
+        self, key: str, source_path: str, size: int, metadata: dict | None
+    ) -> tuple[str, dict]:
+        dest_path = os.path.join(self._objects_dir, _key_digest(key))
+        now = time.time()
         entry = {
             "path": dest_path,
             "size": size,
-            "created_at": now,
+            "created_at": int(now),
             "last_access": now,
         }
         if metadata:
             entry.update(metadata)
-        index = self._load_index()
-        index[key] = entry
-        self._write_index(index)
-        self._evict_if_needed(index)
-        return dest_path
+        os.replace(source_path, dest_path)
+        return dest_path, entry
+
+    def _commit(self, records: list[tuple[str, dict]]) -> None:
+        if not records:
+            return
+        with self._transaction():
+            self._write_touches()
+            for key, entry in records:
+                row = self._db.execute(
+                    "SELECT path, size FROM entries WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and row[0] != entry["path"]:
+                    _remove_quietly(row[0])
+                self._db.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                    _entry_to_row(key, entry),
+                )
+                self._add_size(int(entry.get("size", 0)) - (row[1] if row is not None else 0))
+            self._evict_if_needed()
 
     def _touch(self, key: str, entry: dict) -> None:
-        entry["last_access"] = int(time.time())
-        index = self._load_index()
-        index[key] = entry
-        self._write_index(index)
+        entry["last_access"] = time.time()
+        self._pending_touches[key] = entry["last_access"]
+        if time.monotonic() - self._last_flush >= _TOUCH_FLUSH_SECONDS:
+            self._flush_touches()
+
+    def _flush_touches(self) -> None:
+        self._last_flush = time.monotonic()
+        if self._pending_touches:
+            with self._transaction():
+                self._write_touches()
+
+    def _write_touches(self) -> None:
+        if not self._pending_touches:
+            return
+        pending, self._pending_touches = self._pending_touches, {}
+        self._db.executemany(
+            "UPDATE entries SET last_access = ? WHERE key = ?",
+            [(last_access, key) for key, last_access in pending.items()],
+        )
+
+    def _flush_touches_quietly(self) -> None:
+        try:
+            self.flush()
+        except (OSError, sqlite3.Error):
+            pass
 
     def _expired(self, entry: dict) -> bool:
         ttl = self._config.ttl_seconds
         if ttl is None:
             return False
         last_access = entry.get("last_access", 0)
-        return (int(time.time()) - int(last_access)) > ttl
+        return (time.time() - float(last_access)) > ttl
 
-    def _evict_if_needed(self, index: dict) -> None:
+    def _evict_if_needed(self) -> None:
         max_bytes = max(0, int(self._config.max_bytes))
-        total = sum(int(v.get("size", 0)) for v in index.values())
-        if total <= max_bytes:
-            return
-        entries = sorted(
-            index.items(),
-            key=lambda kv: int(kv[1].get("last_access", 0)),
-        )
-        for key, entry in entries:
-            self._delete_entry(key, entry)
-            total = sum(int(v.get("size", 0)) for v in index.values())
-            if total <= max_bytes:
+        (total,) = self._db.execute("SELECT total_size FROM meta WHERE id = 0").fetchone()
+        while total > max_bytes:
+            victims = self._db.execute(
+                "SELECT key, path, size FROM entries ORDER BY last_access, rowid LIMIT ?",
+                (_EVICT_BATCH,),
+            ).fetchall()
+            if not victims:
                 break
+            for key, path, size in victims:
+                self._delete_entry(key, {"path": path, "size": size})
+                total -= int(size)
+                if total <= max_bytes:
+                    break
 
     def _delete_entry(self, key: str, entry: dict) -> None:
         path = entry.get("path")
-        if path and os.path.exists(path):
-            try:
-                os.remove(path)
-            except OSError:
-                pass
-        index = self._load_index()
-        if key in index:
-            del index[key]
-            self._write_index(index)
+        if path:
+            _remove_quietly(path)
+        self._pending_touches.pop(key, None)
+        with self._transaction():
+            deleted = self._db.execute("DELETE FROM entries WHERE key = ?", (key,)).rowcount
+            if deleted:
+                self._add_size(-int(entry.get("size", 0)))
 
-    def delete(self, key: str) -> None:
-        entry = self._load_index().get(key)
-        if entry is not None:
-            self._delete_entry(key, entry)
+    def _add_size(self, delta: int) -> None:
+        if delta:
+            self._db.execute("UPDATE meta SET total_size = total_size + ? WHERE id = 0", (delta,))
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(
+            self._index_path, timeout=30, isolation_level=None, check_same_thread=False
+        )
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        for statement in _SCHEMA:
+            db.execute(statement)
+        return db
 
-    def _load_index(self) -> dict:
-        if not os.path.exists(self._index_path):
-            return {}
+    @contextmanager
+    def _transaction(self):
+        if self._db.in_transaction:
+            yield
+            return
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        self._db.execute("COMMIT")
+
+    def _migrate_jsonl_index(self) -> None:
+        legacy_path = os.path.join(self._dir, "index.jsonl")
+        try:
+            handle = open(legacy_path, "rb")
+        except FileNotFoundError:
+            return
         index: dict = {}
-        with open(self._index_path, "r", encoding="utf-8") as handle:
+        with handle:
             for line in handle:
                 line = line.strip()
                 if not line:
                     continue
-                record = json.loads(line)
+                try:
+                    record = _json_loads(line)
+                except ValueError:
+                    continue
                 key = record.get("key")
-                if key:
+                if not key:
+                    continue
+                if record.get("op") == "del":
+                    index.pop(key, None)
+                else:
                     index[key] = record.get("entry", {})
-        return index
-
-    def _write_index(self, index: dict) -> None:
-        fd, path = tempfile.mkstemp(prefix="dig-open-data-index-", suffix=".jsonl")
-        os.close(fd)
-        with open(path, "w", encoding="utf-8") as handle:
-            for key, entry in index.items():
-                handle.write(json.dumps({"key": key, "entry": entry}) + "\n")
-        os.replace(path, self._index_path)
+        with self._transaction():
+            self._db.executemany(
+                "INSERT OR IGNORE INTO entries VALUES (?, ?, ?, ?, ?, ?)",
+                [_entry_to_row(key, entry) for key, entry in index.items() if entry.get("path")],
+            )
+            self._db.execute(
+                "UPDATE meta SET total_size = (SELECT COALESCE(SUM(size), 0) FROM entries)"
+            )
+        _remove_quietly(legacy_path)
 
     def _cleanup_partials(self) -> None:
         try:
-            for name in os.listdir(self._objects_dir):
-                if name.endswith(".partial"):
-                    try:
-                        os.remove(os.path.join(self._objects_dir, name))
-                    except OSError:
-                        pass
+            with os.scandir(self._objects_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".partial"):
+                        try:
+                            os.remove(entry.path)
+                        except OSError:
+                            pass
         except OSError:
             pass
 
+
+def _entry_to_row(key: str, entry: dict) -> tuple:
+    metadata = {name: value for name, value in entry.items() if name not in _ENTRY_FIELDS}
+    return (
+        key,
+        entry["path"],
+        int(entry.get("size", 0)),
+        int(entry.get("created_at", 0)),
+        float(entry.get("last_access", 0)),
+        _json_dumps(metadata) if metadata else None,
+    )
+
+
+def _row_to_entry(row: tuple) -> dict:
+    path, size, created_at, last_access, metadata = row
+    entry = {
+        "path": path,
+        "size": size,
+        "created_at": created_at,
+        "last_access": last_access,
+    }
+    if metadata:
+        entry.update(_json_loads(metadata))
+    return entry
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+@lru_cache(maxsize=4096)
+def _key_digest(key: str) -> str:
+    return blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def get_cache_store(config: CacheConfig) -> CacheStore:
+    with _INDEX_LOCK:
+        store = _STORES.get(config)
+        if store is None:
+            store = CacheStore(config)
+            _STORES[config] = store
+        return store
+
+
+@atexit.register
+def _flush_stores() -> None:
+    with _INDEX_LOCK:
+        stores = list(_STORES.values())
+    for store in stores:
+        store._flush_touches_quietly()
+
+
+@lru_cache(maxsize=1)
 def cache_config_from_env() -> CacheConfig | None:
     cache_dir = os.environ.get("DIG_OPEN_DATA_CACHE_DIR")
     if not cache_dir:
         return None
-    max_bytes = _parse_int_env("DIG_OPEN_DATA_CACHE_MAX_BYTES", 10 * 1024**3)
+    max_bytes = _parse_size_env("DIG_OPEN_DATA_CACHE_MAX_BYTES", 10 * 1024**3)
     ttl_days = _parse_int_env("DIG_OPEN_DATA_CACHE_TTL_DAYS", None)
     return CacheConfig(dir=cache_dir, max_bytes=max_bytes, ttl_days=ttl_days)
 
@@ -160,3 +395,14 @@ def _parse_int_env(name: str, default: int | None) -> int | None:
         return int(value)
     except ValueError:
         return default
+
+
+def _parse_size_env(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    if value is None or value == "":
+        return default
+    match = _SIZE_RE.match(value)
+    if match is None:
+        return default
+    number, unit = match.groups()
+    return int(number) * _SIZE_UNITS[unit[:1].upper()]
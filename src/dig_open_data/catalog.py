@@ -1,26 +1,23 @@
 from __future__ import annotations
 
+import heapq
 import os
+import threading
+import urllib.error
 import urllib.parse
-import urllib.request
 import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import Iterable
+from functools import lru_cache
+from typing import Callable, Iterable
 
 from .api import open_text
+from .backends import _POOL
+from .defaults import DEFAULT_BUCKET, DEFAULT_PREFIX, DEFAULT_SUFFIX, DOC_FILENAMES
 
-DEFAULT_BUCKET = "dig-open-bottom-line-analysis"
-DEFAULT_PREFIX = "bottom-line/"
-DEFAULT_SUFFIX = ".sumstats.tsv.gz"
-DOC_FILENAMES = (
-    "README",
-    "README.md",
-    "README.txt",
-    "docs.md",
-    "documentation.md",
-    "manifest.json",
-    "metadata.json",
-)
+_SHARD_BOUNDARIES = tuple("48BGLQVbglqv")
+_DOC_FETCH_WORKERS = 16
+_S3_REQUEST_SLOTS = threading.BoundedSemaphore(16)
 
 
 @dataclass(frozen=True)
@@ -61,6 +58,8 @@ def list_all_objects(
     prefix: str = "",
     delimiter: str | None = None,
     max_keys: int = 1000,
+    contains: str | None = None,
+    early_stop: Callable[[list[str], list[str]], bool] | None = None,
 ) -> ListObjectsResult:
     keys: list[str] = []
     prefixes: list[str] = []
@@ -73,7 +72,10 @@ def list_all_objects(
             max_keys=max_keys,
             continuation_token=token,
         )
-        keys.extend(page.keys)
+        if contains:
+            keys.extend(key for key in page.keys if contains in key)
+        else:
+            keys.extend(page.keys)
         prefixes.extend(page.common_prefixes)
         if not page.is_truncated:
             return ListObjectsResult(
@@ -82,9 +84,70 @@ def list_all_objects(
                 is_truncated=False,
                 next_token=None,
             )
+        if early_stop is not None and early_stop(keys, prefixes):
+            return ListObjectsResult(
+                keys=keys,
+                common_prefixes=prefixes,
+                is_truncated=True,
+                next_token=page.next_token,
+            )
         token = page.next_token
 
 
+def list_all_objects_parallel(
+    *,
+    bucket: str = DEFAULT_BUCKET,
+    prefix: str = "",
+    delimiter: str | None = None,
+    max_keys: int = 1000,
+    max_workers: int = 8,
+) -> ListObjectsResult:
+    first = _list_objects_page(
+        bucket=bucket,
+        prefix=prefix,
+        delimiter=delimiter,
+        max_keys=max_keys,
+        continuation_token=None,
+    )
+    if not first.is_truncated:
+        return first
+
+    last = _last_listed(first)
+    bounds = [prefix + c for c in _SHARD_BOUNDARIES if prefix + c > last]
+    ranges: list[tuple[str | None, str | None, str | None]] = [
+        (None, first.next_token, bounds[0] if bounds else None)
+    ]
+    for lower, upper in zip(bounds, bounds[1:] + [None]):
+        ranges.append((lower, None, upper))
+
+    def run(bounded: tuple[str | None, str | None, str | None]) -> ListObjectsResult:
+        start_after, token, upper = bounded
+        return _list_range(
+            bucket=bucket,
+            prefix=prefix,
+            delimiter=delimiter,
+            max_keys=max_keys,
+            start_after=start_after,
+            continuation_token=token,
+            upper=upper,
+        )
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+        parts = list(pool.map(run, ranges))
+
+    keys = list(first.keys)
+    prefixes = list(first.common_prefixes)
+    for part in parts:
+        keys.extend(part.keys)
+        prefixes.extend(part.common_prefixes)
+    return ListObjectsResult(
+        keys=keys,
+        common_prefixes=prefixes,
+        is_truncated=False,
+        next_token=None,
+    )
+
+
 def list_datasets(
     *,
     bucket: str = DEFAULT_BUCKET,
@@ -93,9 +156,13 @@ def list_datasets(
     limit: int | None = None,
 ) -> list[str]:
     result = list_all_objects(
-        bucket=bucket, prefix=prefix, delimiter="/", max_keys=max_keys
+        bucket=bucket,
+        prefix=prefix,
+        delimiter="/",
+        max_keys=max_keys,
+        early_stop=None if limit is None else (lambda keys, prefixes: len(prefixes) >= limit),
     )
-    datasets = sorted(set(result.common_prefixes))
+    datasets = list(dict.fromkeys(result.common_prefixes))
     if limit is None:
         return datasets
     return datasets[: max(0, limit)]
@@ -110,8 +177,7 @@ def list_ancestries(
     result = list_all_objects(
         bucket=bucket, prefix=_ensure_prefix(prefix), delimiter="/", max_keys=max_keys
     )
-    ancestries = [p.rstrip("/").split("/")[-1] for p in result.common_prefixes]
-    return sorted(set(ancestries))
+    return sorted({p.rstrip("/").rsplit("/", 1)[-1] for p in result.common_prefixes})
 
 
 def list_dataset_files(
@@ -127,11 +193,14 @@ def list_dataset_files(
     if ancestry:
         effective_prefix = _join_prefix(effective_prefix, ancestry)
     result = list_all_objects(
-        bucket=bucket, prefix=effective_prefix, delimiter=None, max_keys=max_keys
+        bucket=bucket,
+        prefix=effective_prefix,
+        delimiter=None,
+        max_keys=max_keys,
+        contains=contains,
+        early_stop=None if limit is None else (lambda keys, prefixes: len(keys) >= limit),
     )
-    files = sorted(result.keys)
-    if contains:
-        files = [key for key in files if contains in key]
+    files = result.keys
     if limit is None:
         return files
     return files[: max(0, limit)]
@@ -165,7 +234,7 @@ def list_files_with_metadata(
     limit: int | None = None,
     contains: str | None = None,
 ) -> list[FileEntry]:
-    keys = list_dataset_files(
+    entries = _iter_file_entries(
         bucket=bucket,
         prefix=prefix,
         max_keys=max_keys,
@@ -173,20 +242,9 @@ def list_files_with_metadata(
         ancestry=ancestry,
         contains=contains,
     )
-    base_prefix = _ensure_prefix(prefix)
-    entries: list[FileEntry] = []
-    for key in keys:
-        entry = _key_to_file_entry(
-            key,
-            base_prefix=base_prefix,
-            default_prefix=DEFAULT_PREFIX,
-            ancestry_override=ancestry,
-        )
-        entries.append(entry)
-    entries = sorted(entries, key=lambda e: (e.ancestry or "", e.key))
     if limit is None:
-        return entries
-    return entries[: max(0, limit)]
+        return sorted(entries, key=_file_entry_order)
+    return heapq.nsmallest(max(0, limit), entries, key=_file_entry_order)
 
 
 def list_traits(
@@ -198,12 +256,12 @@ def list_traits(
     limit: int | None = None,
     contains: str | None = None,
 ) -> list[str]:
-    entries = list_files_with_metadata(
+    entries = _iter_file_entries(
         bucket=bucket,
         prefix=prefix,
-        ancestry=ancestry,
         max_keys=max_keys,
         limit=None,
+        ancestry=ancestry,
         contains=contains,
     )
     traits = sorted({entry.trait for entry in entries if entry.trait})
@@ -257,12 +315,11 @@ def get_documentation(
     doc_names = {name.lower() for name in doc_filenames}
     matches = [key for key in keys if os.path.basename(key).lower() in doc_names]
 
-    docs: dict[str, str] = {}
-    for key in matches:
-        uri = f"s3://{bucket}/{key}"
-        with open_text(uri) as handle:
-            docs[key] = handle.read()
-    return docs
+    uris = [f"s3://{bucket}/{key}" for key in matches]
+    if len(uris) <= 1:
+        return dict(zip(matches, map(_read_document, uris)))
+    with ThreadPoolExecutor(max_workers=min(_DOC_FETCH_WORKERS, len(uris))) as pool:
+        return dict(zip(matches, pool.map(_read_document, uris)))
 
 
 def list_datasets_with_docs(
@@ -273,16 +330,67 @@ def list_datasets_with_docs(
     doc_filenames: Iterable[str] = DOC_FILENAMES,
 ) -> list[tuple[str, dict[str, str]]]:
     datasets = list_datasets(bucket=bucket, prefix=prefix)
-    results: list[tuple[str, dict[str, str]]] = []
-    for dataset in datasets:
-        docs = get_documentation(
+
+    def fetch(dataset: str) -> dict[str, str]:
+        return get_documentation(
             dataset,
             bucket=bucket,
             recursive=recursive,
             doc_filenames=doc_filenames,
         )
-        results.append((dataset, docs))
-    return results
+
+    if len(datasets) <= 1:
+        return [(dataset, fetch(dataset)) for dataset in datasets]
+    with ThreadPoolExecutor(max_workers=min(_DOC_FETCH_WORKERS, len(datasets))) as pool:
+        return list(zip(datasets, pool.map(fetch, datasets)))
+
+
+def _read_document(uri: str) -> str:
+    with _S3_REQUEST_SLOTS:
+        with open_text(uri) as handle:
+            return handle.read()
+
+
+def _list_range(
+    *,
+    bucket: str,
+    prefix: str,
+    delimiter: str | None,
+    max_keys: int,
+    start_after: str | None,
+    continuation_token: str | None,
+    upper: str | None,
+) -> ListObjectsResult:
+    keys: list[str] = []
+    prefixes: list[str] = []
+    token = continuation_token
+    while True:
+        page = _list_objects_page(
+            bucket=bucket,
+            prefix=prefix,
+            delimiter=delimiter,
+            max_keys=max_keys,
+            continuation_token=token,
+            start_after=start_after if token is None else None,
+        )
+        if upper is None:
+            keys.extend(page.keys)
+            prefixes.extend(page.common_prefixes)
+        else:
+            keys.extend(key for key in page.keys if key <= upper)
+            prefixes.extend(p for p in page.common_prefixes if p <= upper)
+        if not page.is_truncated or (upper is not None and _last_listed(page) > upper):
+            return ListObjectsResult(
+                keys=keys,
+                common_prefixes=prefixes,
+                is_truncated=False,
+                next_token=None,
+            )
+        token = page.next_token
+
+
+def _last_listed(page: ListObjectsResult) -> str:
+    return max(page.keys[-1:] + page.common_prefixes[-1:], default="")
 
 
 def _list_objects_page(
@@ -292,6 +400,7 @@ def _list_objects_page(
     delimiter: str | None,
     max_keys: int,
     continuation_token: str | None,
+    start_after: str | None = None,
 ) -> ListObjectsResult:
     query = {
         "list-type": "2",
@@ -303,11 +412,12 @@ def _list_objects_page(
         query["delimiter"] = delimiter
     if continuation_token:
         query["continuation-token"] = continuation_token
+    if start_after:
+        query["start-after"] = start_after
 
     url = f"https://{bucket}.s3.amazonaws.com?{urllib.parse.urlencode(query)}"
-    request = urllib.request.Request(url, method="GET", headers={"User-Agent": "dig-open-data/0.1"})
     try:
-        with urllib.request.urlopen(request, timeout=60) as response:
+        with _S3_REQUEST_SLOTS, _POOL.request("GET", url, timeout=60) as response:
             body = response.read()
     except urllib.error.HTTPError as exc:
         raise RuntimeError(
@@ -351,12 +461,14 @@ def _parse_list_objects(xml_bytes: bytes) -> ListObjectsResult:
     )
 
 
+@lru_cache(maxsize=256)
 def _ensure_prefix(prefix: str) -> str:
     if not prefix:
         return prefix
     return prefix if prefix.endswith("/") else f"{prefix}/"
 
 
+@lru_cache(maxsize=256)
 def _join_prefix(base: str, suffix: str) -> str:
     base = _ensure_prefix(base)
     suffix = suffix.strip("/")
@@ -366,12 +478,11 @@ def _join_prefix(base: str, suffix: str) -> str:
 def _extract_ancestry_from_key(key: str, base_prefix: str) -> str | None:
     if not key.startswith(base_prefix):
         return None
-    remainder = key[len(base_prefix) :]
-    if "/" not in remainder:
-        return None
-    return remainder.split("/", 1)[0]
+    head, sep, _ = key[len(base_prefix) :].partition("/")
+    return head if sep else None
 
 
+@lru_cache(maxsize=256)
 def _extract_ancestry_from_prefix(prefix: str, base_prefix: str) -> str | None:
     base = _ensure_prefix(base_prefix)
     pref = _ensure_prefix(prefix)
@@ -383,6 +494,39 @@ def _extract_ancestry_from_prefix(prefix: str, base_prefix: str) -> str | None:
     return remainder.split("/", 1)[0]
 
 
+def _iter_file_entries(
+    *,
+    bucket: str,
+    prefix: str,
+    max_keys: int,
+    limit: int | None,
+    ancestry: str | None,
+    contains: str | None,
+) -> Iterable[FileEntry]:
+    keys = list_dataset_files(
+        bucket=bucket,
+        prefix=prefix,
+        max_keys=max_keys,
+        limit=limit,
+        ancestry=ancestry,
+        contains=contains,
+    )
+    base_prefix = _ensure_prefix(prefix)
+    return (
+        _key_to_file_entry(
+            key,
+            base_prefix=base_prefix,
+            default_prefix=DEFAULT_PREFIX,
+            ancestry_override=ancestry,
+        )
+        for key in keys
+    )
+
+
+def _file_entry_order(entry: FileEntry) -> tuple[str, str]:
+    return (entry.ancestry or "", entry.key)
+
+
 def _key_to_file_entry(
     key: str,
     *,
@@ -1,25 +1,33 @@
 from __future__ import annotations
 
 import argparse
+import codecs
+import dataclasses
 import json
 import sys
+from functools import lru_cache
 
-from .catalog import (
-    DOC_FILENAMES,
-    DEFAULT_BUCKET,
-    DEFAULT_PREFIX,
-    get_documentation,
-    list_ancestries,
-    list_dataset_files,
-    list_files_with_metadata,
-    list_traits,
-    open_trait,
-)
-from .api import open_text
-
-
-def build_parser() -> argparse.ArgumentParser:
-    parser = argparse.ArgumentParser(
+from .defaults import DEFAULT_BUCKET, DEFAULT_PREFIX, DOC_FILENAMES
+
+_STREAM_CHUNK_CHARS = 1 << 16
+_STREAM_CHUNK_BYTES = 1 << 20
+
+
+class _NeedFullParser(Exception):
+    pass
+
+
+class _SniffedParser(argparse.ArgumentParser):
+    def error(self, message):
+        raise _NeedFullParser(message)
+
+    def print_help(self, file=None):
+        raise _NeedFullParser("help")
+
+
+def build_parser(only: str | None = None) -> argparse.ArgumentParser:
+    parser_class = argparse.ArgumentParser if only is None else _SniffedParser
+    parser = parser_class(
         prog="dig-open-data",
         description="Utilities for listing DIG Open Data datasets and documentation.",
     )
@@ -29,7 +37,28 @@ def build_parser() -> argparse.ArgumentParser:
         help=f"S3 bucket to query (default: {DEFAULT_BUCKET})",
     )
     subparsers = parser.add_subparsers(dest="command", required=True)
+    for name, add_parser in _SUBCOMMANDS.items():
+        if only is None or only == name:
+            add_parser(subparsers)
+    return parser
+
+
+@lru_cache(maxsize=None)
+def _get_parser(only: str | None) -> argparse.ArgumentParser:
+    return build_parser(only=only)
+
+
+def _parse_args(argv: list[str]) -> argparse.Namespace:
+    only = _sniff_subcommand(argv)
+    if only is not None:
+        try:
+            return _get_parser(only).parse_args(argv)
+        except _NeedFullParser:
+            pass
+    return _get_parser(None).parse_args(argv)
 
+
+def _add_list_parser(subparsers) -> None:
     list_parser = subparsers.add_parser(
         "list", help="List files (keys) under the DIG prefix"
     )
@@ -71,6 +100,8 @@ def build_parser() -> argparse.ArgumentParser:
         help="Max keys per S3 request (pagination still applied)",
     )
 
+
+def _add_ancestries_parser(subparsers) -> None:
     ancestry_parser = subparsers.add_parser("ancestries", help="List available ancestries")
     ancestry_parser.add_argument(
         "--prefix",
@@ -89,6 +120,8 @@ def build_parser() -> argparse.ArgumentParser:
         help="Max keys per S3 request (pagination still applied)",
     )
 
+
+def _add_docs_parser(subparsers) -> None:
     docs_parser = subparsers.add_parser("docs", help="Fetch documentation for a dataset")
     docs_parser.add_argument("dataset", help="Dataset prefix (e.g., dataset1/)")
     docs_parser.add_argument(
@@ -99,7 +132,7 @@ def build_parser() -> argparse.ArgumentParser:
     docs_parser.add_argument(
         "--names",
         nargs="+",
-        default=list(DOC_FILENAMES),
+        default=None,
         help="Documentation filenames to match (default: common README/manifest names)",
     )
     docs_parser.add_argument(
@@ -108,6 +141,8 @@ def build_parser() -> argparse.ArgumentParser:
         help="Emit JSON mapping of key to content",
     )
 
+
+def _add_traits_parser(subparsers) -> None:
     traits_parser = subparsers.add_parser("traits", help="List trait names")
     traits_parser.add_argument(
         "--prefix",
@@ -142,6 +177,8 @@ def build_parser() -> argparse.ArgumentParser:
         help="Max keys per S3 request (pagination still applied)",
     )
 
+
+def _add_stream_parser(subparsers) -> None:
     stream_parser = subparsers.add_parser("stream", help="Stream a file to stdout")
     stream_group = stream_parser.add_mutually_exclusive_group(required=True)
     stream_group.add_argument("--uri", help="File URI or path to stream")
@@ -162,15 +199,176 @@ def build_parser() -> argparse.ArgumentParser:
         default="utf-8",
         help="Text encoding to use (default: utf-8)",
     )
-    return parser
+
+
+_SUBCOMMANDS = {
+    "list": _add_list_parser,
+    "ancestries": _add_ancestries_parser,
+    "docs": _add_docs_parser,
+    "traits": _add_traits_parser,
+    "stream": _add_stream_parser,
+}
+
+
+def _sniff_subcommand(argv: list[str]) -> str | None:
+    skip_value = False
+    for token in argv:
+        if skip_value:
+            skip_value = False
+            continue
+        if token == "--bucket":
+            skip_value = True
+            continue
+        if token.startswith("-"):
+            continue
+        return token if token in _SUBCOMMANDS else None
+    return None
+
+
+def _is_utf8(*encodings: str | None) -> bool:
+    try:
+        return all(encoding and codecs.lookup(encoding).name == "utf-8" for encoding in encodings)
+    except LookupError:
+        return False
+
+
+_STREAM_FLAGS = {
+    "--uri": "uri",
+    "--file": "file_key",
+    "--trait": "trait",
+    "--ancestry": "ancestry",
+    "--prefix": "prefix",
+    "--encoding": "encoding",
+}
+
+
+def _parse_stream_argv(argv: list[str]) -> argparse.Namespace | None:
+    values = {
+        "bucket": DEFAULT_BUCKET,
+        "uri": None,
+        "file_key": None,
+        "trait": None,
+        "ancestry": None,
+        "prefix": DEFAULT_PREFIX,
+        "encoding": "utf-8",
+    }
+    seen = set()
+    command = False
+    tokens = iter(argv)
+    for token in tokens:
+        if token == "stream" and not command:
+            command = True
+            continue
+        flag, sep, value = token.partition("=")
+        if command:
+            dest = _STREAM_FLAGS.get(flag)
+        else:
+            dest = "bucket" if flag == "--bucket" else None
+        if dest is None or dest in seen:
+            return None
+        if not sep:
+            value = next(tokens, None)
+            if value is None or value.startswith("-"):
+                return None
+        seen.add(dest)
+        values[dest] = value
+    if not command:
+        return None
+    if sum(values[dest] is not None for dest in ("uri", "file_key", "trait")) != 1:
+        return None
+    return argparse.Namespace(command="stream", **values)
+
+
+def _copy_utf8_to_stdout(handle, buffer) -> None:
+    decode = codecs.getincrementaldecoder("utf-8")().decode
+    read = handle.read
+    write = buffer.write
+    sys.stdout.flush()
+    carry = b""
+    while True:
+        block = read(_STREAM_CHUNK_BYTES)
+        if not block:
+            break
+        decode(block)
+        block = carry + block
+        carry = b"\r" if block.endswith(b"\r") else b""
+        if carry:
+            block = block[:-1]
+        if b"\r" in block:
+            block = block.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+        write(block)
+    decode(b"", True)
+    if carry:
+        write(b"\n")
+    buffer.flush()
+
+
+def _copy_text_to_stdout(handle) -> None:
+    stdout = sys.stdout
+    buffer = getattr(stdout, "buffer", None)
+    read = handle.read
+    if buffer is None:
+        write = stdout.write
+        while True:
+            chunk = read(_STREAM_CHUNK_CHARS)
+            if not chunk:
+                return
+            write(chunk)
+    encoding = stdout.encoding or "utf-8"
+    errors = stdout.errors or "strict"
+    stdout.flush()
+    write = buffer.write
+    while True:
+        chunk = read(_STREAM_CHUNK_CHARS)
+        if not chunk:
+            break
+        write(chunk.encode(encoding, errors))
+    buffer.flush()
+
+
+def _write_lines(lines) -> None:
+    try:
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+    except BrokenPipeError:
+        pass
+
+
+def _emit_json(payload) -> None:
+    try:
+        import orjson
+    except ImportError:
+        orjson = None
+    if orjson is None:
+        print(json.dumps(payload, indent=2, default=_json_default))
+        return
+    data = orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+    buffer = getattr(sys.stdout, "buffer", None)
+    if buffer is None:
+        sys.stdout.write(data.decode("utf-8"))
+        return
+    sys.stdout.flush()
+    buffer.write(data)
+    buffer.flush()
+
+
+def _json_default(obj):
+    if dataclasses.is_dataclass(obj):
+        return dataclasses.asdict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
 
 
 def main(argv: list[str] | None = None) -> int:
-    parser = build_parser()
-    args = parser.parse_args(argv)
+    if argv is None:
+        argv = sys.argv[1:]
+    args = _parse_stream_argv(argv)
+    if args is None:
+        args = _parse_args(argv)
 
     if args.command == "list":
         if args.with_ancestry:
+            from .catalog import list_files_with_metadata
+
             entries = list_files_with_metadata(
                 bucket=args.bucket,
                 prefix=args.prefix,
@@ -180,26 +378,20 @@ def main(argv: list[str] | None = None) -> int:
                 contains=args.contains,
             )
             if args.json:
-                payload = [
-                    {
-                        "ancestry": entry.ancestry,
-                        "trait": entry.trait,
-                        "filename": entry.filename,
-                        "key": entry.key,
-                    }
-                    for entry in entries
-                ]
-                print(json.dumps(payload, indent=2))
+                _emit_json(entries)
             else:
                 if not entries:
                     print("No files found.", file=sys.stderr)
                     return 1
-                for entry in entries:
-                    ancestry = entry.ancestry if entry.ancestry is not None else "-"
-                    trait = entry.trait if entry.trait is not None else "-"
-                    print(f"{ancestry}\t{trait}\t{entry.key}")
+                _write_lines(
+                    f"{'-' if entry.ancestry is None else entry.ancestry}\t"
+                    f"{'-' if entry.trait is None else entry.trait}\t{entry.key}"
+                    for entry in entries
+                )
             return 0
 
+        from .catalog import list_dataset_files
+
         results = list_dataset_files(
             bucket=args.bucket,
             prefix=args.prefix,
@@ -209,30 +401,32 @@ def main(argv: list[str] | None = None) -> int:
             contains=args.contains,
         )
         if args.json:
-            print(json.dumps(results, indent=2))
+            _emit_json(results)
         else:
             if not results:
                 print("No files found.", file=sys.stderr)
                 return 1
-            for item in results:
-                print(item)
+            _write_lines(results)
         return 0
 
     if args.command == "ancestries":
+        from .catalog import list_ancestries
+
         ancestries = list_ancestries(
             bucket=args.bucket, prefix=args.prefix, max_keys=args.max_keys
         )
         if args.json:
-            print(json.dumps(ancestries, indent=2))
+            _emit_json(ancestries)
         else:
             if not ancestries:
                 print("No ancestries found.", file=sys.stderr)
                 return 1
-            for ancestry in ancestries:
-                print(ancestry)
+            _write_lines(ancestries)
         return 0
 
     if args.command == "traits":
+        from .catalog import list_traits
+
         traits = list_traits(
             bucket=args.bucket,
             prefix=args.prefix,
@@ -242,24 +436,25 @@ def main(argv: list[str] | None = None) -> int:
             contains=args.contains,
         )
         if args.json:
-            print(json.dumps(traits, indent=2))
+            _emit_json(traits)
         else:
             if not traits:
                 print("No traits found.", file=sys.stderr)
                 return 1
-            for trait in traits:
-                print(trait)
+            _write_lines(traits)
         return 0
 
     if args.command == "docs":
+        from .catalog import get_documentation
+
         docs = get_documentation(
             args.dataset,
             bucket=args.bucket,
             recursive=args.recursive,
-            doc_filenames=args.names,
+            doc_filenames=args.names if args.names is not None else DOC_FILENAMES,
         )
         if args.json:
-            print(json.dumps(docs, indent=2))
+            _emit_json(docs)
             return 0
 
         if not docs:
@@ -275,31 +470,34 @@ def main(argv: list[str] | None = None) -> int:
         return 0
 
     if args.command == "stream":
+        if args.uri:
+            uri = args.uri
+        elif args.file_key:
+            uri = f"s3://{args.bucket}/{args.file_key}"
+        else:
+            if not args.ancestry:
+                print("--trait requires --ancestry", file=sys.stderr)
+                return 2
+            from .catalog import build_key
+
+            uri = f"s3://{args.bucket}/{build_key(args.ancestry, args.trait, prefix=args.prefix)}"
         try:
-            if args.uri:
-                handle = open_text(args.uri, encoding=args.encoding)
-            elif args.file_key:
-                uri = f"s3://{args.bucket}/{args.file_key}"
-                handle = open_text(uri, encoding=args.encoding)
+            buffer = getattr(sys.stdout, "buffer", None)
+            if buffer is not None and _is_utf8(args.encoding, sys.stdout.encoding):
+                from .api import open_binary
+
+                with open_binary(uri, decompress=True) as handle:
+                    _copy_utf8_to_stdout(handle, buffer)
             else:
-                if not args.ancestry:
-                    print("--trait requires --ancestry", file=sys.stderr)
-                    return 2
-                handle = open_trait(
-                    args.ancestry,
-                    args.trait,
-                    bucket=args.bucket,
-                    prefix=args.prefix,
-                    encoding=args.encoding,
-                )
-            with handle:
-                for chunk in handle:
-                    sys.stdout.write(chunk)
+                from .api import open_text
+
+                with open_text(uri, encoding=args.encoding) as handle:
+                    _copy_text_to_stdout(handle)
         except BrokenPipeError:
             return 0
         return 0
 
-    parser.error("Unknown command")
+    _get_parser(None).error("Unknown command")
     return 2
 
 
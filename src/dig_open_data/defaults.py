@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+DEFAULT_BUCKET = "dig-open-bottom-line-analysis"
+DEFAULT_PREFIX = "bottom-line/"
+DEFAULT_SUFFIX = ".sumstats.tsv.gz"
+DOC_FILENAMES = (
+    "README",
+    "README.md",
+    "README.txt",
+    "docs.md",
+    "documentation.md",
+    "manifest.json",
+    "metadata.json",
+)
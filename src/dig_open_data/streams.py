@@ -2,23 +2,40 @@ from __future__ import annotations
 
 import csv
 import gzip
+import http.client
 import io
-from contextlib import ExitStack
 from typing import BinaryIO, Callable, Iterator, TextIO
 
+try:
+    from isal import igzip as _gzip
+except ImportError:
+    try:
+        from zlib_ng import gzip_ng as _gzip
+    except ImportError:
+        _gzip = gzip
+
 GZIP_MAGIC = b"\x1f\x8b"
 
+_open_text: Callable[..., TextIO] | None = None
+
+_READ_BUFFER_SIZE = 1 << 20
+_TEXT_CHUNK_SIZE = 1 << 16
+
 
 class ManagedTextIO:
-    def __init__(self, text_stream: TextIO, stack: ExitStack) -> None:
+    def __init__(self, text_stream: TextIO, closeables: tuple) -> None:
         self._text_stream = text_stream
-        self._stack = stack
+        self._closeables = closeables
+        self.readline = text_stream.readline
+        self.read = text_stream.read
+        self._lines = text_stream if isinstance(text_stream, io.IOBase) else iter(text_stream)
 
     def close(self) -> None:
         try:
             self._text_stream.close()
         finally:
-            self._stack.close()
+            for closeable in reversed(self._closeables):
+                _safe_close(closeable)
 
     def __enter__(self) -> "ManagedTextIO":
         return self
@@ -27,13 +44,10 @@ class ManagedTextIO:
         self.close()
 
     def __iter__(self):
-        return iter(self._text_stream)
-
-    def readline(self, *args, **kwargs):
-        return self._text_stream.readline(*args, **kwargs)
+        return self._lines
 
-    def read(self, *args, **kwargs):
-        return self._text_stream.read(*args, **kwargs)
+    def __next__(self):
+        return next(self._lines)
 
     def readable(self):
         return self._text_stream.readable()
@@ -46,22 +60,87 @@ class ManagedTextIO:
         return getattr(self._text_stream, name)
 
 
-def open_text_stream(binary_stream: BinaryIO, encoding: str) -> ManagedTextIO:
-    stack = ExitStack()
-    stack.callback(_safe_close, binary_stream)
+def open_text_stream(
+    binary_stream: BinaryIO,
+    encoding: str,
+    *,
+    buffer_size: int = _READ_BUFFER_SIZE,
+) -> ManagedTextIO:
+    decoded, closeables = _decompressed(binary_stream, buffer_size)
+    text = io.TextIOWrapper(decoded, encoding=encoding, line_buffering=False)
 
-    buffered = io.BufferedReader(binary_stream)
-    stack.callback(_safe_close, buffered)
+    return ManagedTextIO(text, closeables + (decoded,))
 
-    peek = buffered.peek(2)[:2]
-    if peek == GZIP_MAGIC:
-        decompressor = gzip.GzipFile(fileobj=buffered)
-        stack.callback(_safe_close, decompressor)
-        text = io.TextIOWrapper(decompressor, encoding=encoding)
-    else:
-        text = io.TextIOWrapper(buffered, encoding=encoding)
 
-    return ManagedTextIO(text, stack)
+def open_binary_stream(binary_stream: BinaryIO) -> BinaryIO:
+    if isinstance(binary_stream, io.BufferedIOBase):
+        return binary_stream
+    return io.BufferedReader(binary_stream, buffer_size=_READ_BUFFER_SIZE)
+
+
+def open_decompressed_stream(
+    binary_stream: BinaryIO, *, buffer_size: int = _READ_BUFFER_SIZE
+) -> ManagedTextIO:
+    decoded, closeables = _decompressed(binary_stream, buffer_size)
+    return ManagedTextIO(decoded, closeables)
+
+
+def _decompressed(binary_stream: BinaryIO, buffer_size: int) -> tuple[BinaryIO, tuple]:
+    buffered = io.BufferedReader(binary_stream, buffer_size=buffer_size)
+    if buffered.peek(2)[:2] == GZIP_MAGIC:
+        return _gzip.GzipFile(fileobj=buffered), (binary_stream, buffered)
+    return buffered, (binary_stream,)
+
+
+class ResumableBinaryStream(io.RawIOBase):
+    def __init__(self, opener: Callable[[int], BinaryIO], retries: int) -> None:
+        self._opener = opener
+        self._remaining = max(0, retries)
+        self._offset = 0
+        self._stream = opener(0)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while True:
+            try:
+                count = self._readinto(buffer)
+            except _RESUME_ERRORS:
+                if not self._resume():
+                    raise
+                continue
+            self._offset += count
+            return count
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            _safe_close(self._stream)
+        finally:
+            super().close()
+
+    def _readinto(self, buffer) -> int:
+        readinto = getattr(self._stream, "readinto", None)
+        if readinto is not None:
+            return readinto(buffer) or 0
+        data = self._stream.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+    def _resume(self) -> bool:
+        while self._remaining > 0:
+            self._remaining -= 1
+            _safe_close(self._stream)
+            try:
+                self._stream = self._opener(self._offset)
+            except _RESUME_ERRORS:
+                if self._remaining <= 0:
+                    raise
+                continue
+            return True
+        return False
 
 
 class RetryingTextIO:
@@ -87,24 +166,24 @@ class RetryingTextIO:
     def __iter__(self):
         while True:
             line = self.readline()
-            if line == "":
+            if not line:
                 return
             yield line
 
-    def readline(self, *args, **kwargs):
+    def readline(self, size: int = -1) -> str:
         while True:
             try:
-                line = self._stream.readline(*args, **kwargs)
+                line = self._stream.readline(size)
                 self._chars_read += len(line)
                 return line
             except _RETRY_ERRORS:
                 if not self._retry():
                     raise
 
-    def read(self, *args, **kwargs):
+    def read(self, size: int = -1) -> str:
         while True:
             try:
-                data = self._stream.read(*args, **kwargs)
+                data = self._stream.read(size)
                 self._chars_read += len(data)
                 return data
             except _RETRY_ERRORS:
@@ -131,12 +210,13 @@ class RetryingTextIO:
         return True
 
     def _skip_chars(self, count: int) -> None:
+        read = self._stream.read
         remaining = count
         while remaining > 0:
-            chunk = self._stream.read(min(8192, remaining))
-            if chunk == "":
+            skipped = len(read(min(_TEXT_CHUNK_SIZE, remaining)))
+            if not skipped:
                 raise EOFError("Stream ended before retry offset could be reached")
-            remaining -= len(chunk)
+            remaining -= skipped
 
 
 def open_text_stream_with_retries(
@@ -147,24 +227,74 @@ def open_text_stream_with_retries(
 
 
 def iter_lines(uri: str, *, encoding: str = "utf-8") -> Iterator[str]:
-    from .api import open_text
-
+    open_text = _get_open_text()
     with open_text(uri, encoding=encoding) as handle:
         for line in handle:
             yield line
 
 
 def iter_tsv_dicts(
-    uri: str, *, delimiter: str = "\t", encoding: str = "utf-8"
+    uri: str,
+    *,
+    delimiter: str = "\t",
+    encoding: str = "utf-8",
+    quoted: bool = False,
 ) -> Iterator[dict[str, str]]:
-    from .api import open_text
+    open_text = _get_open_text()
+    with open_text(uri, encoding=encoding) as handle:
+        if quoted or delimiter == ",":
+            yield from csv.DictReader(handle, delimiter=delimiter)
+            return
+        # No csv quoting here: a quoted field holding a tab or newline is split.
+        yield from _split_dicts(handle, delimiter)
+
 
+def iter_tsv_records(
+    uri: str, *, delimiter: str = "\t", encoding: str = "utf-8"
+) -> Iterator[list[str]]:
+    open_text = _get_open_text()
     with open_text(uri, encoding=encoding) as handle:
-        reader = csv.DictReader(handle, delimiter=delimiter)
-        for row in reader:
+        yield from _split_records(handle, delimiter)
+
+
+def _split_records(handle: TextIO, delimiter: str) -> Iterator[list[str]]:
+    for first in handle:
+        if first.rstrip("\r\n"):
+            break
+    else:
+        return
+    yield first.rstrip("\r\n").split(delimiter)
+    for line in handle:
+        fields = line.rstrip("\r\n").split(delimiter)
+        if fields != [""]:
+            yield fields
+
+
+def _split_dicts(handle: TextIO, delimiter: str) -> Iterator[dict[str, str]]:
+    records = _split_records(handle, delimiter)
+    header = next(records, None)
+    if header is None:
+        return
+    width = len(header)
+    for fields in records:
+        if len(fields) == width:
+            yield dict(zip(header, fields))
+        else:
+            row = dict(zip(header, fields))
+            if len(fields) > width:
+                row[None] = fields[width:]
+            else:
+                row.update(dict.fromkeys(header[len(fields):]))
             yield row
 
 
+def _get_open_text() -> Callable[..., TextIO]:
+    global _open_text
+    if _open_text is None:
+        from .api import open_text as _open_text
+    return _open_text
+
+
 def _safe_close(obj) -> None:
     try:
         obj.close()
@@ -172,4 +302,10 @@ def _safe_close(obj) -> None:
         pass
 
 
-_RETRY_ERRORS = (gzip.BadGzipFile, EOFError, OSError)
+_RESUME_ERRORS = (OSError, http.client.HTTPException)
+_RETRY_ERRORS = (
+    gzip.BadGzipFile,
+    getattr(_gzip, "BadGzipFile", gzip.BadGzipFile),
+    EOFError,
+    OSError,
+)
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import gzip
+import io
+import unittest
+from functools import lru_cache
+from unittest import mock
+
+
+@lru_cache(maxsize=None)
+def gz(content: bytes) -> bytes:
+    return gzip.compress(content)
+
+
+class MemoryReader(io.RawIOBase):
+    def __init__(self, data) -> None:
+        self._view = memoryview(data)
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        count = min(len(buffer), len(self._view) - self._pos)
+        buffer[:count] = self._view[self._pos : self._pos + count]
+        self._pos += count
+        return count
+
+
+class FakeBackend:
+    schemes = {"fake"}
+
+    def __init__(self, payloads: list[bytes]) -> None:
+        self._payloads = tuple(payloads)
+        self.calls = 0
+
+    def open_binary(self, uri: str) -> MemoryReader:
+        self.calls += 1
+        index = min(self.calls - 1, len(self._payloads) - 1)
+        return MemoryReader(self._payloads[index])
+
+    def exists(self, uri: str) -> bool:
+        return True
+
+
+class RangeBackend(FakeBackend):
+    supports_ranges = True
+
+    def __init__(self, payload: bytes) -> None:
+        super().__init__([payload])
+        self._payload = payload
+        self.ranges: list[str] = []
+        self.head_calls = 0
+
+    def open_binary(self, uri: str, *, headers: dict | None = None) -> MemoryReader:
+        self.calls += 1
+        range_header = (headers or {}).get("Range")
+        if range_header is None:
+            response = MemoryReader(self._payload)
+            response.headers = {"Content-Length": str(len(self._payload)), "ETag": "\"range\""}
+            return response
+        self.ranges.append(range_header)
+        start, end = range_header[len("bytes=") :].split("-")
+        response = MemoryReader(memoryview(self._payload)[int(start) : int(end) + 1])
+        response.status = 206
+        return response
+
+    def head_metadata(self, uri: str) -> dict:
+        self.head_calls += 1
+        return {"content_length": len(self._payload), "etag": "range"}
+
+
+class MetaBackend(FakeBackend):
+    def __init__(self, payloads, etags):
+        super().__init__(payloads)
+        self._etags = etags
+        self._head_calls = 0
+
+    def head_metadata(self, uri: str) -> dict:
+        self._head_calls += 1
+        index = min(self.calls, len(self._etags) - 1)
+        return {"etag": self._etags[index], "last_modified": f"t{index}"}
+
+
+class ConditionalBackend(FakeBackend):
+    supports_conditional_get = True
+
+    def __init__(self, payload):
+        super().__init__([payload])
+        self.conditional_headers = []
+
+    def open_binary(self, uri: str, *, headers: dict | None = None):
+        if headers:
+            self.conditional_headers.append(headers)
+            response = io.BytesIO(b"")
+            response.status = 304
+            return response
+        response = super().open_binary(uri)
+        response.headers = {"ETag": "\"etag1\""}
+        return response
+
+    def head_metadata(self, uri: str) -> dict:
+        raise AssertionError("HEAD should not be issued")
+
+
+class ChunkReader(io.TextIOBase):
+    def __init__(self, chunks) -> None:
+        self._chunks = iter(chunks)
+
+    def readable(self) -> bool:
+        return True
+
+    def read(self, size: int | None = -1) -> str:
+        return next(self._chunks, "")
+
+
+class ListSink:
+    def __init__(self) -> None:
+        self._parts: list[str] = []
+        self.write = self._parts.append
+
+    def flush(self) -> None:
+        pass
+
+    def getvalue(self) -> str:
+        return "".join(self._parts)
+
+
+class BackendTestCase(unittest.TestCase):
+    def setUp(self):
+        for target in (
+            "dig_open_data.api._BACKENDS",
+            "dig_open_data.api._HEAD_CACHE",
+            "dig_open_data.cache._STORES",
+        ):
+            patcher = mock.patch.dict(target)
+            patcher.start()
+            self.addCleanup(patcher.stop)
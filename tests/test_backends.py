@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import http.server
+import threading
+import unittest
+import urllib.error
+from unittest import mock
+
+from dig_open_data.backends import _MAX_REDIRECTS, _HttpPool
+
+BODY = b"0123456789" * 1000
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.requests.append((self.path, self.client_address[1]))
+        if self.path == "/data":
+            self._reply(200, BODY)
+        elif self.path == "/missing":
+            self._reply(404, b"not here")
+        elif self.path == "/loop":
+            self._reply(302, b"", {"Location": "/loop"})
+        elif self.path.startswith("/hop/"):
+            remaining = int(self.path[len("/hop/") :])
+            location = "/data" if remaining == 0 else f"/hop/{remaining - 1}"
+            self._reply(302, b"", {"Location": location})
+        elif self.path == "/truncated":
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(BODY)))
+            self.end_headers()
+            self.wfile.write(BODY[:10])
+            self.wfile.flush()
+            self.close_connection = True
+
+    def _reply(self, status: int, body: bytes, headers: dict | None = None) -> None:
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _Server(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass
+
+
+class TestHttpPool(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = _Server(("127.0.0.1", 0), _Handler)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.server.requests = []
+        self.pool = _HttpPool(maxsize=4)
+        self.addCleanup(self.pool.clear)
+
+    def _client_ports(self) -> list[int]:
+        return [port for _, port in self.server.requests]
+
+    def test_connection_reused_after_full_read(self):
+        for _ in range(3):
+            with self.pool.request("GET", f"{self.base}/data") as response:
+                self.assertEqual(response.read(), BODY)
+
+        self.assertEqual(len(set(self._client_ports())), 1)
+
+    def test_connection_discarded_after_partial_read(self):
+        with self.pool.request("GET", f"{self.base}/data") as response:
+            self.assertEqual(response.read(10), BODY[:10])
+        with self.pool.request("GET", f"{self.base}/data") as response:
+            self.assertEqual(response.read(), BODY)
+
+        self.assertEqual(len(set(self._client_ports())), 2)
+
+    def test_connection_discarded_after_truncated_body(self):
+        with self.pool.request("GET", f"{self.base}/truncated") as response:
+            data = b""
+            while True:
+                chunk = response.read(4096)
+                if not chunk:
+                    break
+                data += chunk
+            self.assertEqual(data, BODY[:10])
+
+        self.assertEqual(self.pool._idle, {})
+
+    def test_redirects_followed_up_to_limit(self):
+        with self.pool.request("GET", f"{self.base}/hop/{_MAX_REDIRECTS - 1}") as response:
+            self.assertEqual(response.read(), BODY)
+            self.assertTrue(response.url.endswith("/data"))
+
+        with self.assertRaises(urllib.error.HTTPError) as raised:
+            self.pool.request("GET", f"{self.base}/loop")
+        self.assertEqual(raised.exception.code, 302)
+        self.assertEqual(len(self.server.requests), _MAX_REDIRECTS + 1 + _MAX_REDIRECTS + 1)
+
+    def test_error_status_raises_http_error(self):
+        with self.assertRaises(urllib.error.HTTPError) as raised:
+            self.pool.request("GET", f"{self.base}/missing")
+
+        self.assertEqual(raised.exception.code, 404)
+        self.assertEqual(raised.exception.read(), b"not here")
+        with self.pool.request("GET", f"{self.base}/data") as response:
+            self.assertEqual(response.read(), BODY)
+        self.assertEqual(len(set(self._client_ports())), 1)
+
+
+class TestHttpPoolProxy(unittest.TestCase):
+    def test_proxy_uses_tunnel(self):
+        with mock.patch(
+            "urllib.request.getproxies", return_value={"https": "http://proxy.local:3128"}
+        ), mock.patch("urllib.request.proxy_bypass", return_value=False):
+            conn = _HttpPool._new_connection(("https", "bucket.example", 443), 5)
+
+        self.assertEqual((conn.host, conn.port), ("proxy.local", 3128))
+        self.assertEqual((conn._tunnel_host, conn._tunnel_port), ("bucket.example", 443))
+
+    def test_proxy_bypass_connects_directly(self):
+        with mock.patch(
+            "urllib.request.getproxies", return_value={"https": "http://proxy.local:3128"}
+        ), mock.patch("urllib.request.proxy_bypass", return_value=True):
+            conn = _HttpPool._new_connection(("https", "bucket.example", 443), 5)
+
+        self.assertEqual((conn.host, conn.port), ("bucket.example", 443))
+        self.assertIsNone(conn._tunnel_host)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from dig_open_data import cache
+from dig_open_data.cache import CacheConfig, CacheStore, get_cache_store
+
+
+def _put(store: CacheStore, tmpdir: str, key: str, payload: bytes) -> str:
+    source = os.path.join(tmpdir, "source")
+    with open(source, "wb") as handle:
+        handle.write(payload)
+    return store.put(key, source, len(payload))
+
+
+def _total_size(store: CacheStore) -> tuple[int, int]:
+    (tracked,) = store._db.execute("SELECT total_size FROM meta").fetchone()
+    (actual,) = store._db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+    return tracked, actual
+
+
+class TestCacheIndex(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(cache._STORES)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_put_delete_survive_reload(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config = CacheConfig(dir=os.path.join(tmpdir, "cache"), max_bytes=1 << 20)
+            store = get_cache_store(config)
+            _put(store, tmpdir, "a", b"aaa")
+            _put(store, tmpdir, "b", b"bbb")
+            store.delete("a")
+
+            reloaded = CacheStore(config)
+            self.assertIsNone(reloaded.get("a"))
+            self.assertEqual(reloaded.get("b")["size"], 3)
+
+    def test_reloads_index_written_by_another_store(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config = CacheConfig(dir=os.path.join(tmpdir, "cache"), max_bytes=1 << 20)
+            first = get_cache_store(config)
+            second = CacheStore(config)
+            _put(first, tmpdir, "a", b"aaa")
+            self.assertIsNone(second.get("b"))
+            _put(first, tmpdir, "b", b"bb")
+
+            self.assertEqual(second.get("b")["size"], 2)
+
+    def test_evicts_least_recently_used(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config = CacheConfig(dir=os.path.join(tmpdir, "cache"), max_bytes=5)
+            store = get_cache_store(config)
+            _put(store, tmpdir, "a", b"aa")
+            _put(store, tmpdir, "b", b"bb")
+            self.assertIsNotNone(store.get("a"))
+            _put(store, tmpdir, "c", b"cc")
+
+            self.assertIsNone(store.get("b"))
+            self.assertIsNotNone(store.get("a"))
+            self.assertIsNotNone(store.get("c"))
+
+    def test_tracks_total_size_across_writes(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config = CacheConfig(dir=os.path.join(tmpdir, "cache"), max_bytes=6)
+            store = get_cache_store(config)
+            _put(store, tmpdir, "a", b"aa")
+            _put(store, tmpdir, "b", b"bbb")
+            _put(store, tmpdir, "a", b"a")
+            self.assertEqual(_total_size(store), (4, 4))
+            store.delete("b")
+            self.assertEqual(_total_size(store), (1, 1))
+            _put(store, tmpdir, "c", b"cccc")
+            _put(store, tmpdir, "d", b"dd")
+
+            self.assertEqual(_total_size(store), (6, 6))
+            self.assertEqual(_total_size(CacheStore(config)), (6, 6))
+
+    def test_exit_hook_flushes_registered_stores(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config = CacheConfig(dir=os.path.join(tmpdir, "cache"), max_bytes=1 << 20)
+            store = get_cache_store(config)
+            _put(store, tmpdir, "a", b"aa")
+            with mock.patch("dig_open_data.cache._TOUCH_FLUSH_SECONDS", 3600):
+                touched = store.get("a")["last_access"]
+
+            cache._flush_stores()
+
+            (stored,) = CacheStore(config)._db.execute(
+                "SELECT last_access FROM entries WHERE key = 'a'"
+            ).fetchone()
+            self.assertEqual(stored, touched)
+
+    def test_deferred_puts_commit_once(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config = CacheConfig(dir=os.path.join(tmpdir, "cache"), max_bytes=1 << 20)
+            store = get_cache_store(config)
+            sources = []
+            for i in range(3):
+                source = os.path.join(tmpdir, f"source{i}")
+                with open(source, "wb") as handle:
+                    handle.write(b"x" * i)
+                sources.append((f"k{i}", source, i, None))
+            store.put_many(sources[:2])
+            store.put(*sources[2][:3], defer_commit=True)
+            self.assertIsNone(CacheStore(config).get("k2"))
+            store.commit()
+
+            reloaded = CacheStore(config)
+            self.assertEqual([reloaded.get(f"k{i}")["size"] for i in range(3)], [0, 1, 2])
+
+    def test_migrates_legacy_jsonl_index(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            config = CacheConfig(dir=os.path.join(tmpdir, "cache"), max_bytes=1 << 20)
+            os.makedirs(os.path.join(config.dir, "objects"))
+            legacy = os.path.join(config.dir, "objects", "0" * 64)
+            with open(legacy, "wb") as handle:
+                handle.write(b"old")
+            records = [
+                {"key": "k", "entry": {"path": legacy, "size": 3, "last_access": 0, "etag": "e1"}},
+                {"key": "gone", "entry": {"path": legacy, "size": 3}, "op": "put"},
+                {"key": "gone", "op": "del"},
+            ]
+            with open(os.path.join(config.dir, "index.jsonl"), "w", encoding="utf-8") as handle:
+                handle.writelines(json.dumps(record) + "\n" for record in records)
+
+            store = get_cache_store(config)
+            entry = store.get("k")
+            self.assertEqual((entry["path"], entry["etag"]), (legacy, "e1"))
+            self.assertIsNone(store.get("gone"))
+            self.assertFalse(os.path.exists(os.path.join(config.dir, "index.jsonl")))
+
+            path = _put(store, tmpdir, "k", b"new")
+
+            self.assertNotEqual(path, legacy)
+            self.assertEqual(len(os.path.basename(path)), 32)
+            self.assertFalse(os.path.exists(legacy))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,14 +2,18 @@ from __future__ import annotations
 
 import io
 import unittest
+import urllib.error
 from unittest import mock
 
 from dig_open_data.catalog import (
     FileEntry,
     ListObjectsResult,
+    _list_objects_page,
+    list_all_objects_parallel,
     _parse_list_objects,
     get_documentation,
     list_dataset_files,
+    list_datasets_with_docs,
     list_files_with_metadata,
     list_traits,
 )
@@ -35,6 +39,78 @@ class TestParseListObjects(unittest.TestCase):
         )
         self.assertEqual(result.common_prefixes, ["dataset1/", "dataset2/"])
 
+    def test_parse_truncated_page_ignores_request_prefix(self):
+        xml = b"""<?xml version=\"1.0\" encoding=\"UTF-8\"?>
+<ListBucketResult xmlns=\"http://s3.amazonaws.com/doc/2006-03-01/\">
+  <Prefix>dataset1/</Prefix>
+  <IsTruncated>true</IsTruncated>
+  <NextContinuationToken>token-2</NextContinuationToken>
+  <Contents><Key>dataset1/file1.tsv.gz</Key><Size>10</Size></Contents>
+</ListBucketResult>
+"""
+        result = _parse_list_objects(xml)
+        self.assertTrue(result.is_truncated)
+        self.assertEqual(result.next_token, "token-2")
+        self.assertEqual(result.keys, ["dataset1/file1.tsv.gz"])
+        self.assertEqual(result.common_prefixes, [])
+
+
+class TestListObjectsPage(unittest.TestCase):
+    def test_list_objects_page_uses_shared_pool(self):
+        xml = b"""<ListBucketResult><IsTruncated>false</IsTruncated>
+<Contents><Key>a/b.tsv.gz</Key></Contents></ListBucketResult>"""
+        with mock.patch(
+            "dig_open_data.catalog._POOL.request", return_value=io.BytesIO(xml)
+        ) as mocked:
+            result = _list_objects_page(
+                bucket="bucket",
+                prefix="a/",
+                delimiter=None,
+                max_keys=10,
+                continuation_token=None,
+            )
+
+        self.assertEqual(result.keys, ["a/b.tsv.gz"])
+        method, url = mocked.call_args[0]
+        self.assertEqual(method, "GET")
+        self.assertTrue(url.startswith("https://bucket.s3.amazonaws.com?list-type=2"))
+
+    def test_list_objects_page_http_error(self):
+        error = urllib.error.HTTPError("https://example.com", 403, "Forbidden", None, io.BytesIO())
+        with mock.patch("dig_open_data.catalog._POOL.request", side_effect=error):
+            with self.assertRaises(RuntimeError):
+                _list_objects_page(
+                    bucket="bucket",
+                    prefix="",
+                    delimiter=None,
+                    max_keys=10,
+                    continuation_token=None,
+                )
+
+
+class TestListAllObjectsParallel(unittest.TestCase):
+    def test_parallel_listing_matches_full_listing(self):
+        keys = sorted(f"p/{c}{i}" for c in "0Zaqz_" for i in range(7))
+
+        def fake_page(*, bucket, prefix, delimiter, max_keys, continuation_token, start_after=None):
+            start = int(continuation_token) if continuation_token else 0
+            if start_after is not None:
+                start = sum(1 for key in keys if key <= start_after)
+            page = keys[start : start + max_keys]
+            end = start + len(page)
+            return ListObjectsResult(
+                keys=page,
+                common_prefixes=[],
+                is_truncated=end < len(keys),
+                next_token=str(end) if end < len(keys) else None,
+            )
+
+        with mock.patch("dig_open_data.catalog._list_objects_page", side_effect=fake_page):
+            result = list_all_objects_parallel(bucket="bucket", prefix="p/", max_keys=4)
+
+        self.assertEqual(result.keys, keys)
+        self.assertFalse(result.is_truncated)
+
 
 class TestGetDocumentation(unittest.TestCase):
     def test_get_documentation(self):
@@ -55,6 +131,26 @@ class TestGetDocumentation(unittest.TestCase):
 
         self.assertEqual(docs, {"dataset1/README.md": "doc"})
 
+    def test_list_datasets_with_docs_preserves_order(self):
+        def fake_list(*, bucket, prefix, delimiter, **kwargs):
+            if delimiter == "/" and prefix == "":
+                return ListObjectsResult(["top.txt"], ["a/", "b/", "c/"], False, None)
+            return ListObjectsResult([f"{prefix}README.md", f"{prefix}data.tsv.gz"], [], False, None)
+
+        with mock.patch("dig_open_data.catalog.list_all_objects", side_effect=fake_list):
+            with mock.patch(
+                "dig_open_data.catalog.open_text", side_effect=lambda uri: io.StringIO(uri)
+            ):
+                results = list_datasets_with_docs()
+
+        self.assertEqual(
+            results,
+            [
+                (name, {f"{name}README.md": f"s3://dig-open-bottom-line-analysis/{name}README.md"})
+                for name in ["a/", "b/", "c/"]
+            ],
+        )
+
 
 class TestListDatasetFiles(unittest.TestCase):
     def test_list_dataset_files(self):
@@ -81,10 +177,21 @@ class TestListDatasetFiles(unittest.TestCase):
             is_truncated=False,
             next_token=None,
         )
-        with mock.patch("dig_open_data.catalog.list_all_objects", return_value=fake_result):
+        with mock.patch("dig_open_data.catalog._list_objects_page", return_value=fake_result):
             files = list_dataset_files(prefix="bottom-line/EU/", contains="T2D")
         self.assertEqual(files, ["bottom-line/EU/AlbInT2D.sumstats.tsv.gz"])
 
+    def test_list_dataset_files_limit_stops_paging(self):
+        pages = [
+            ListObjectsResult([f"bottom-line/EU/{i}.tsv.gz" for i in range(3)], [], True, "t1"),
+            ListObjectsResult(["bottom-line/EU/9.tsv.gz"], [], False, None),
+        ]
+        with mock.patch("dig_open_data.catalog._list_objects_page", side_effect=pages) as mocked:
+            files = list_dataset_files(ancestry="EU", limit=2)
+
+        self.assertEqual(files, ["bottom-line/EU/0.tsv.gz", "bottom-line/EU/1.tsv.gz"])
+        self.assertEqual(mocked.call_count, 1)
+
 
 class TestListFilesWithMetadata(unittest.TestCase):
     def test_list_files_with_metadata(self):
@@ -148,7 +255,7 @@ class TestListFilesWithMetadata(unittest.TestCase):
             is_truncated=False,
             next_token=None,
         )
-        with mock.patch("dig_open_data.catalog.list_all_objects", return_value=fake_result):
+        with mock.patch("dig_open_data.catalog._list_objects_page", return_value=fake_result):
             entries = list_files_with_metadata(prefix="bottom-line/EU/", contains="T2D")
         self.assertEqual(
             entries,
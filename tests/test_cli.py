@@ -3,189 +3,232 @@ from __future__ import annotations
 import io
 import unittest
 from contextlib import redirect_stderr, redirect_stdout
+from types import SimpleNamespace
 from unittest import mock
 
 from dig_open_data import cli
 
+from _fakes import ChunkReader, ListSink
+
+
+def _run(argv: list[str]) -> tuple[int, str]:
+    out = ListSink()
+    with redirect_stdout(out):
+        code = cli.main(argv)
+    return code, out.getvalue()
+
+
+def _patch(testcase: unittest.TestCase, target: str) -> mock.MagicMock:
+    patcher = mock.patch(target)
+    testcase.addCleanup(patcher.stop)
+    return patcher.start()
+
 
 class TestCliList(unittest.TestCase):
-    def test_list_plain(self):
-        with mock.patch(
-            "dig_open_data.cli.list_dataset_files",
-            return_value=["bottom-line/Mixed/a.tsv.gz", "bottom-line/EA/b.tsv.gz"],
-        ):
-            out = io.StringIO()
-            with redirect_stdout(out):
-                code = cli.main(["list"])
-        self.assertEqual(code, 0)
-        self.assertEqual(
-            out.getvalue().strip().splitlines(),
-            ["bottom-line/Mixed/a.tsv.gz", "bottom-line/EA/b.tsv.gz"],
+    def setUp(self):
+        self.list_dataset_files = _patch(self, "dig_open_data.catalog.list_dataset_files")
+        self.list_files_with_metadata = _patch(
+            self, "dig_open_data.catalog.list_files_with_metadata"
         )
 
+    def test_list_plain(self):
+        cases = [
+            (
+                ["list"],
+                ["bottom-line/Mixed/a.tsv.gz", "bottom-line/EA/b.tsv.gz"],
+                {"limit": None, "contains": None},
+            ),
+            (
+                ["list", "--limit", "2"],
+                ["bottom-line/Mixed/a.tsv.gz"],
+                {"limit": 2, "contains": None},
+            ),
+            (
+                ["list", "--contains", "T2D"],
+                ["bottom-line/EU/AlbInT2D.sumstats.tsv.gz"],
+                {"limit": None, "contains": "T2D"},
+            ),
+        ]
+        for argv, keys, call_kwargs in cases:
+            with self.subTest(argv=argv):
+                self.list_dataset_files.return_value = keys
+                code, out = _run(argv)
+                self.assertEqual(code, 0)
+                self.assertEqual(out, "".join(f"{key}\n" for key in keys))
+                self.list_dataset_files.assert_called_with(
+                    bucket=cli.DEFAULT_BUCKET,
+                    prefix=cli.DEFAULT_PREFIX,
+                    ancestry=None,
+                    max_keys=1000,
+                    **call_kwargs,
+                )
+
     def test_list_json(self):
-        with mock.patch(
-            "dig_open_data.cli.list_dataset_files",
-            return_value=["bottom-line/Mixed/a.tsv.gz"],
-        ):
-            out = io.StringIO()
-            with redirect_stdout(out):
-                code = cli.main(["list", "--json"])
-        self.assertEqual(code, 0)
-        self.assertIn("\"bottom-line/Mixed/a.tsv.gz\"", out.getvalue())
-
-    def test_list_limit(self):
-        with mock.patch(
-            "dig_open_data.cli.list_dataset_files",
-            return_value=["bottom-line/Mixed/a.tsv.gz"],
-        ) as mocked:
-            out = io.StringIO()
-            with redirect_stdout(out):
-                code = cli.main(["list", "--limit", "2"])
+        self.list_dataset_files.return_value = ["bottom-line/Mixed/a.tsv.gz"]
+        code, out = _run(["list", "--json"])
         self.assertEqual(code, 0)
-        self.assertEqual(
-            out.getvalue().strip().splitlines(),
-            ["bottom-line/Mixed/a.tsv.gz"],
-        )
-        mocked.assert_called_with(
-            bucket=cli.DEFAULT_BUCKET,
-            prefix=cli.DEFAULT_PREFIX,
-            ancestry=None,
-            limit=2,
-            max_keys=1000,
-            contains=None,
-        )
+        self.assertIn("\"bottom-line/Mixed/a.tsv.gz\"", out)
 
     def test_list_with_ancestry(self):
-        entries = [
-            mock.Mock(
-                ancestry="Mixed",
-                trait="Perc15",
-                filename="Perc15.sumstats.tsv.gz",
-                key="bottom-line/Mixed/Perc15.sumstats.tsv.gz",
+        cases = [
+            (
+                [
+                    SimpleNamespace(
+                        ancestry="Mixed",
+                        trait="Perc15",
+                        filename="Perc15.sumstats.tsv.gz",
+                        key="bottom-line/Mixed/Perc15.sumstats.tsv.gz",
+                    ),
+                    SimpleNamespace(
+                        ancestry="EA",
+                        trait="CAD",
+                        filename="CAD.sumstats.tsv.gz",
+                        key="bottom-line/EA/CAD.sumstats.tsv.gz",
+                    ),
+                ],
+                "Mixed\tPerc15\tbottom-line/Mixed/Perc15.sumstats.tsv.gz\n"
+                "EA\tCAD\tbottom-line/EA/CAD.sumstats.tsv.gz\n",
             ),
-            mock.Mock(
-                ancestry="EA",
-                trait="CAD",
-                filename="CAD.sumstats.tsv.gz",
-                key="bottom-line/EA/CAD.sumstats.tsv.gz",
+            (
+                [
+                    SimpleNamespace(
+                        ancestry=None,
+                        trait=None,
+                        filename="README.md",
+                        key="bottom-line/README.md",
+                    ),
+                ],
+                "-\t-\tbottom-line/README.md\n",
             ),
         ]
-        with mock.patch("dig_open_data.cli.list_files_with_metadata", return_value=entries) as mocked:
-            out = io.StringIO()
-            with redirect_stdout(out):
-                code = cli.main(["list", "--with-ancestry"])
-        self.assertEqual(code, 0)
-        self.assertEqual(
-            out.getvalue().strip().splitlines(),
-            [
-                "Mixed\tPerc15\tbottom-line/Mixed/Perc15.sumstats.tsv.gz",
-                "EA\tCAD\tbottom-line/EA/CAD.sumstats.tsv.gz",
-            ],
-        )
-        mocked.assert_called_with(
-            bucket=cli.DEFAULT_BUCKET,
-            prefix=cli.DEFAULT_PREFIX,
-            limit=None,
-            ancestry=None,
-            max_keys=1000,
-            contains=None,
-        )
-
-    def test_list_contains(self):
-        with mock.patch(
-            "dig_open_data.cli.list_dataset_files",
-            return_value=["bottom-line/EU/AlbInT2D.sumstats.tsv.gz"],
-        ) as mocked:
-            out = io.StringIO()
-            with redirect_stdout(out):
-                code = cli.main(["list", "--contains", "T2D"])
-        self.assertEqual(code, 0)
-        self.assertEqual(
-            out.getvalue().strip().splitlines(),
-            ["bottom-line/EU/AlbInT2D.sumstats.tsv.gz"],
-        )
-        mocked.assert_called_with(
-            bucket=cli.DEFAULT_BUCKET,
-            prefix=cli.DEFAULT_PREFIX,
-            ancestry=None,
-            limit=None,
-            max_keys=1000,
-            contains="T2D",
-        )
+        for entries, expected in cases:
+            with self.subTest(expected=expected):
+                self.list_files_with_metadata.return_value = entries
+                code, out = _run(["list", "--with-ancestry"])
+                self.assertEqual(code, 0)
+                self.assertEqual(out, expected)
+                self.list_files_with_metadata.assert_called_with(
+                    bucket=cli.DEFAULT_BUCKET,
+                    prefix=cli.DEFAULT_PREFIX,
+                    limit=None,
+                    ancestry=None,
+                    max_keys=1000,
+                    contains=None,
+                )
 
 
 class TestCliAncestries(unittest.TestCase):
+    def setUp(self):
+        self.list_ancestries = _patch(self, "dig_open_data.catalog.list_ancestries")
+
     def test_ancestries_plain(self):
-        with mock.patch("dig_open_data.cli.list_ancestries", return_value=["AFR", "EUR"]) as mocked:
-            out = io.StringIO()
-            with redirect_stdout(out):
-                code = cli.main(["ancestries"])
+        self.list_ancestries.return_value = ["AFR", "EUR"]
+        code, out = _run(["ancestries"])
         self.assertEqual(code, 0)
-        self.assertEqual(out.getvalue().strip().splitlines(), ["AFR", "EUR"])
-        mocked.assert_called_with(
+        self.assertEqual(out, "AFR\nEUR\n")
+        self.list_ancestries.assert_called_with(
             bucket=cli.DEFAULT_BUCKET, prefix=cli.DEFAULT_PREFIX, max_keys=1000
         )
 
     def test_ancestries_json(self):
-        with mock.patch("dig_open_data.cli.list_ancestries", return_value=["AFR"]):
-            out = io.StringIO()
-            with redirect_stdout(out):
-                code = cli.main(["ancestries", "--json"])
+        self.list_ancestries.return_value = ["AFR"]
+        code, out = _run(["ancestries", "--json"])
         self.assertEqual(code, 0)
-        self.assertIn("\"AFR\"", out.getvalue())
+        self.assertIn("\"AFR\"", out)
 
 
 class TestCliDocs(unittest.TestCase):
+    def setUp(self):
+        self.get_documentation = _patch(self, "dig_open_data.catalog.get_documentation")
+
     def test_docs_plain(self):
         docs = {"dataset1/README.md": "hello"}
-        with mock.patch("dig_open_data.cli.get_documentation", return_value=docs):
-            out = io.StringIO()
-            with redirect_stdout(out):
-                code = cli.main(["docs", "dataset1/"])
+        self.get_documentation.return_value = docs
+        code, out = _run(["docs", "dataset1/"])
         self.assertEqual(code, 0)
-        self.assertIn("dataset1/README.md", out.getvalue())
-        self.assertIn("hello", out.getvalue())
+        self.assertIn("dataset1/README.md", out)
+        self.assertIn("hello", out)
 
     def test_docs_none(self):
-        with mock.patch("dig_open_data.cli.get_documentation", return_value={}):
-            out = io.StringIO()
-            err = io.StringIO()
-            with redirect_stdout(out), redirect_stderr(err):
-                code = cli.main(["docs", "dataset1/"])
+        self.get_documentation.return_value = {}
+        out = ListSink()
+        err = ListSink()
+        with redirect_stdout(out), redirect_stderr(err):
+            code = cli.main(["docs", "dataset1/"])
         self.assertEqual(code, 1)
         self.assertIn("No documentation files found", err.getvalue())
 
     def test_docs_json(self):
         docs = {"dataset1/README.md": "hello"}
-        with mock.patch("dig_open_data.cli.get_documentation", return_value=docs):
-            out = io.StringIO()
-            with redirect_stdout(out):
-                code = cli.main(["docs", "dataset1/", "--json"])
+        self.get_documentation.return_value = docs
+        code, out = _run(["docs", "dataset1/", "--json"])
         self.assertEqual(code, 0)
-        self.assertIn("\"dataset1/README.md\"", out.getvalue())
+        self.assertIn("\"dataset1/README.md\"", out)
 
 
 class TestCliStream(unittest.TestCase):
+    def setUp(self):
+        self.open_text = _patch(self, "dig_open_data.api.open_text")
+        self.open_binary = _patch(self, "dig_open_data.api.open_binary")
+
     def test_stream(self):
-        fake_handle = io.StringIO("line1\nline2\n")
-        with mock.patch("dig_open_data.cli.open_text", return_value=fake_handle):
-            out = io.StringIO()
-            with redirect_stdout(out):
-                code = cli.main(["stream", "--uri", "s3://bucket/key"])
+        fake_handle = ChunkReader(["line1\n", "line2\n"])
+        self.open_text.return_value = fake_handle
+        code, out = _run(["stream", "--uri", "s3://bucket/key"])
+        self.assertEqual(code, 0)
+        self.assertEqual(out, "line1\nline2\n")
+
+    def test_stream_copies_bytes_when_encodings_match(self):
+        payload = "é\t1\n".encode("utf-8") * 3
+        raw = io.BytesIO()
+        out = io.TextIOWrapper(raw, encoding="utf-8")
+        self.open_binary.return_value = io.BytesIO(payload)
+        with redirect_stdout(out):
+            code = cli.main(["stream", "--uri", "s3://bucket/key"])
         self.assertEqual(code, 0)
-        self.assertEqual(out.getvalue(), "line1\nline2\n")
+        self.assertEqual(raw.getvalue(), payload)
+        self.open_binary.assert_called_once_with("s3://bucket/key", decompress=True)
+
+    def test_stream_bytes_path_translates_newlines(self):
+        raw = io.BytesIO()
+        out = io.TextIOWrapper(raw, encoding="utf-8")
+        self.open_binary.return_value = io.BytesIO(b"a\tb\r\n1\t2\r\n3\r4\r")
+        with mock.patch.object(cli, "_STREAM_CHUNK_BYTES", 5), redirect_stdout(out):
+            code = cli.main(["stream", "--uri", "s3://bucket/key"])
+        self.assertEqual(code, 0)
+        self.assertEqual(raw.getvalue(), b"a\tb\n1\t2\n3\n4\n")
+
+    def test_stream_bytes_path_rejects_invalid_utf8(self):
+        raw = io.BytesIO()
+        out = io.TextIOWrapper(raw, encoding="utf-8")
+        self.open_binary.return_value = io.BytesIO(b"ok\n\xff\xfe\n")
+        with redirect_stdout(out):
+            with self.assertRaises(UnicodeDecodeError):
+                cli.main(["stream", "--uri", "s3://bucket/key"])
+        self.assertEqual(raw.getvalue(), b"")
+
+    def test_stream_reencodes_other_encodings(self):
+        fake_handle = ChunkReader(["é\t1\n"] * 3)
+        raw = io.BytesIO()
+        out = io.TextIOWrapper(raw, encoding="utf-8")
+        self.open_text.return_value = fake_handle
+        with redirect_stdout(out):
+            code = cli.main(["stream", "--uri", "s3://bucket/key", "--encoding", "latin-1"])
+        self.assertEqual(code, 0)
+        self.assertEqual(raw.getvalue(), "é\t1\n".encode("utf-8") * 3)
+        self.open_text.assert_called_once_with("s3://bucket/key", encoding="latin-1")
 
 
 class TestCliTraits(unittest.TestCase):
+    def setUp(self):
+        self.list_traits = _patch(self, "dig_open_data.catalog.list_traits")
+
     def test_traits_plain(self):
-        with mock.patch("dig_open_data.cli.list_traits", return_value=["CAD", "T2D"]) as mocked:
-            out = io.StringIO()
-            with redirect_stdout(out):
-                code = cli.main(["traits"])
+        self.list_traits.return_value = ["CAD", "T2D"]
+        code, out = _run(["traits"])
         self.assertEqual(code, 0)
-        self.assertEqual(out.getvalue().strip().splitlines(), ["CAD", "T2D"])
-        mocked.assert_called_with(
+        self.assertEqual(out, "CAD\nT2D\n")
+        self.list_traits.assert_called_with(
             bucket=cli.DEFAULT_BUCKET,
             prefix=cli.DEFAULT_PREFIX,
             ancestry=None,
@@ -195,12 +238,74 @@ class TestCliTraits(unittest.TestCase):
         )
 
     def test_traits_json(self):
-        with mock.patch("dig_open_data.cli.list_traits", return_value=["CAD"]):
-            out = io.StringIO()
-            with redirect_stdout(out):
-                code = cli.main(["traits", "--json"])
+        self.list_traits.return_value = ["CAD"]
+        code, out = _run(["traits", "--json"])
         self.assertEqual(code, 0)
-        self.assertIn("\"CAD\"", out.getvalue())
+        self.assertIn("\"CAD\"", out)
+
+
+class TestCliParser(unittest.TestCase):
+    def test_sniff_subcommand(self):
+        self.assertEqual(cli._sniff_subcommand(["--bucket", "list", "traits"]), "traits")
+        self.assertEqual(cli._sniff_subcommand(["--bucket=b", "docs", "x/"]), "docs")
+        self.assertIsNone(cli._sniff_subcommand(["--help"]))
+        self.assertIsNone(cli._sniff_subcommand(["bogus"]))
+
+    def test_stream_fast_path_matches_argparse(self):
+        for argv in (
+            ["stream", "--uri", "s3://b/k"],
+            ["--bucket", "other", "stream", "--file=a/b.tsv.gz", "--encoding", "latin-1"],
+            ["stream", "--trait", "T2D", "--ancestry", "EU", "--prefix", "p/"],
+        ):
+            with self.subTest(argv=argv):
+                self.assertEqual(cli._parse_stream_argv(argv), cli.build_parser().parse_args(argv))
+
+    def test_stream_fast_path_defers_unusual_argv(self):
+        for argv in (
+            ["stream", "--help"],
+            ["stream", "--uri", "a", "--file", "b"],
+            ["stream", "--uri"],
+            ["stream", "--enc", "utf-8", "--uri", "a"],
+            ["list", "--uri", "a"],
+        ):
+            with self.subTest(argv=argv):
+                self.assertIsNone(cli._parse_stream_argv(argv))
+
+    def test_unknown_command_still_reports_choices(self):
+        stderr = ListSink()
+        with redirect_stderr(stderr):
+            with self.assertRaises(SystemExit):
+                cli.main(["bogus"])
+        self.assertIn("ancestries", stderr.getvalue())
+
+    def test_unhandled_command_reports_error(self):
+        stderr = ListSink()
+        with mock.patch.object(cli, "_parse_args", return_value=SimpleNamespace(command="new")):
+            with redirect_stderr(stderr):
+                with self.assertRaises(SystemExit) as raised:
+                    cli.main(["new"])
+        self.assertEqual(raised.exception.code, 2)
+        self.assertIn("Unknown command", stderr.getvalue())
+
+    def test_errors_and_help_match_full_parser(self):
+        for argv in (
+            ["list", "--bogus"],
+            ["docs"],
+            ["traits", "--help"],
+            ["--bucket", "b", "ancestries", "-h"],
+        ):
+            with self.subTest(argv=argv):
+                expected_out, expected_err = ListSink(), ListSink()
+                with redirect_stdout(expected_out), redirect_stderr(expected_err):
+                    with self.assertRaises(SystemExit) as expected:
+                        cli.build_parser().parse_args(argv)
+                out, err = ListSink(), ListSink()
+                with redirect_stdout(out), redirect_stderr(err):
+                    with self.assertRaises(SystemExit) as raised:
+                        cli.main(argv)
+                self.assertEqual(raised.exception.code, expected.exception.code)
+                self.assertEqual(out.getvalue(), expected_out.getvalue())
+                self.assertEqual(err.getvalue(), expected_err.getvalue())
 
 
 if __name__ == "__main__":
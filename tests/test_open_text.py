@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-import gzip
+import asyncio
+import csv
 import io
 import os
 import tempfile
@@ -8,36 +9,184 @@ import unittest
 import urllib.error
 from unittest import mock
 
-from dig_open_data import open_text, resolve_uri
+from dig_open_data import (
+    async_fetch_many,
+    fetch_many,
+    iter_tsv_dicts,
+    iter_tsv_records,
+    open_binary,
+    open_text,
+    resolve_uri,
+)
+from dig_open_data.api import _select_backend
 from dig_open_data.backends import S3HttpBackend, s3_uri_to_https_url
+from dig_open_data.streams import open_text_stream
+
+from _fakes import gz
+
+GZIP_PAYLOAD = gz(b"col1\tcol2\n1\t2\n")
 
 
 class TestOpenTextLocal(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._tmp = tempfile.TemporaryDirectory()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls._tmp.cleanup()
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self._tmp.name, f"{self._testMethodName}-{name}")
+
     def test_local_plain_text(self):
-        with tempfile.TemporaryDirectory() as tmpdir:
-            path = os.path.join(tmpdir, "sample.tsv")
-            content = "col1\tcol2\n1\t2\n3\t4\n"
-            with open(path, "w", encoding="utf-8") as handle:
-                handle.write(content)
+        path = self._path("sample.tsv")
+        content = "col1\tcol2\n1\t2\n3\t4\n"
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(content)
 
-            with open_text(path) as handle:
-                header = handle.readline()
-                rows = list(handle)
+        with open_text(path) as handle:
+            header = handle.readline()
+            rows = list(handle)
 
         self.assertEqual(header, "col1\tcol2\n")
         self.assertEqual(rows, ["1\t2\n", "3\t4\n"])
 
     def test_local_gzip_text(self):
+        path = self._path("sample.tsv.gz")
+        with open(path, "wb") as handle:
+            handle.write(GZIP_PAYLOAD)
+
+        with open_text(path) as handle:
+            data = handle.read()
+
+        self.assertEqual(data, "col1\tcol2\n1\t2\n")
+
+    def test_small_read_buffer(self):
+        content = "".join(f"{i}\tvalue\n" for i in range(500))
+        stream = open_text_stream(
+            io.BytesIO(gz(content.encode("utf-8"))), "utf-8", buffer_size=64
+        )
+        with stream:
+            self.assertEqual(stream.read(), content)
+
+    def test_iterates_text_stream_directly(self):
+        stream = open_text_stream(io.BytesIO(gz(b"a\nb\nc\n")), "utf-8")
+        with stream:
+            self.assertEqual(next(stream), "a\n")
+            self.assertEqual(list(stream), ["b\n", "c\n"])
+
+    def test_tsv_dicts_match_csv_reader(self):
+        path = self._path("sample.tsv")
+        content = "a\tb\tc\r\n1\t2\t3\r\n\n4\t5\n6\t7\t8\t9\n"
+        with open(path, "w", encoding="utf-8", newline="") as handle:
+            handle.write(content)
+
+        rows = list(iter_tsv_dicts(path))
+
+        expected = list(csv.DictReader(io.StringIO(content), delimiter="\t"))
+        self.assertEqual(rows, expected)
+
+    def test_tsv_dicts_quoted_fields_need_quoted_flag(self):
+        path = self._path("quoted.tsv")
+        content = 'id\tnote\n1\t"a\tb"\n2\t"line\nbreak"\n'
+        with open(path, "w", encoding="utf-8", newline="") as handle:
+            handle.write(content)
+
+        self.assertEqual(
+            list(iter_tsv_dicts(path)),
+            [
+                {"id": "1", "note": '"a', None: ['b"']},
+                {"id": "2", "note": '"line'},
+                {"id": 'break"', "note": None},
+            ],
+        )
+        expected = list(csv.DictReader(io.StringIO(content), delimiter="\t"))
+        self.assertEqual(list(iter_tsv_dicts(path, quoted=True)), expected)
+        self.assertEqual(expected[0]["note"], "a\tb")
+
+    def test_tsv_records_yield_header_once(self):
+        path = self._path("sample.tsv.gz")
+        with open(path, "wb") as handle:
+            handle.write(gz(b"a\tb\n1\t2\n\n3\n"))
+
+        records = iter_tsv_records(path)
+        header = next(records)
+        rows = list(records)
+
+        self.assertEqual(header, ["a", "b"])
+        self.assertEqual(rows, [["1", "2"], ["3"]])
+        self.assertTrue(all(type(record) is list for record in [header, *rows]))
+
+
+class TestOpenBinary(unittest.TestCase):
+    def test_local_gzip_bytes_untouched(self):
         with tempfile.TemporaryDirectory() as tmpdir:
             path = os.path.join(tmpdir, "sample.tsv.gz")
-            content = "col1\tcol2\n1\t2\n"
-            with gzip.open(path, "wb") as handle:
-                handle.write(content.encode("utf-8"))
+            with open(path, "wb") as handle:
+                handle.write(GZIP_PAYLOAD)
 
-            with open_text(path) as handle:
+            with open_binary(path) as handle:
                 data = handle.read()
 
-        self.assertEqual(data, content)
+        self.assertEqual(data, GZIP_PAYLOAD)
+
+    def test_decompress_gzip_bytes(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "sample.tsv.gz")
+            with open(path, "wb") as handle:
+                handle.write(GZIP_PAYLOAD)
+
+            with open_binary(path, decompress=True) as handle:
+                data = handle.read()
+
+        self.assertEqual(data, b"col1\tcol2\n1\t2\n")
+
+
+class TestFetchMany(unittest.TestCase):
+    def test_fetch_many_preserves_order(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            paths = []
+            for i in range(5):
+                path = os.path.join(tmpdir, f"sample{i}.tsv")
+                with open(path, "w", encoding="utf-8") as handle:
+                    handle.write(f"row{i}\n")
+                paths.append(path)
+
+            handles = fetch_many(paths, max_workers=3)
+            contents = []
+            for handle in handles:
+                with handle:
+                    contents.append(handle.read())
+
+        self.assertEqual(contents, [f"row{i}\n" for i in range(5)])
+
+    def test_async_fetch_many(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            paths = []
+            for i in range(3):
+                path = os.path.join(tmpdir, f"sample{i}.tsv")
+                with open(path, "w", encoding="utf-8") as handle:
+                    handle.write(f"row{i}\n")
+                paths.append(path)
+
+            handles = asyncio.run(async_fetch_many(paths))
+            contents = []
+            for handle in handles:
+                with handle:
+                    contents.append(handle.read())
+
+        self.assertEqual(contents, ["row0\n", "row1\n", "row2\n"])
+
+    def test_fetch_many_missing_raises(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "present.tsv")
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write("row\n")
+            missing = os.path.join(tmpdir, "missing.tsv")
+
+            with self.assertRaises(FileNotFoundError):
+                fetch_many([path, missing], retries=0)
 
 
 class TestUriResolution(unittest.TestCase):
@@ -49,6 +198,15 @@ class TestUriResolution(unittest.TestCase):
             "s3://dig-open-bottom-line-analysis/path/file.tsv.gz",
         )
 
+    def test_default_backends_are_shared(self):
+        with mock.patch.dict("dig_open_data.api._BACKENDS", {}, clear=True):
+            first = _select_backend("s3://bucket/key")
+            second = _select_backend("s3://bucket/other")
+            local = _select_backend("/tmp/file.tsv")
+            self.assertIs(first, second)
+            self.assertIsInstance(first, S3HttpBackend)
+            self.assertIs(local, _select_backend("file:///tmp/file.tsv"))
+
     def test_s3_url_building(self):
         uri = "s3://dig-open-bottom-line-analysis/path/file.tsv.gz"
         url = s3_uri_to_https_url(uri)
@@ -71,12 +229,39 @@ class TestS3Backend(unittest.TestCase):
             def __exit__(self, exc_type, exc, tb):
                 self.close()
 
-        with mock.patch("urllib.request.urlopen", return_value=DummyResponse()) as mocked:
+        with mock.patch("dig_open_data.backends._POOL.request", return_value=DummyResponse()) as mocked:
             self.assertTrue(
                 backend.exists("s3://dig-open-bottom-line-analysis/path/file.tsv.gz")
             )
             self.assertTrue(mocked.called)
 
+    def test_remembers_working_endpoint(self):
+        backend = S3HttpBackend(retries=0)
+        working = "https://s3.amazonaws.com/bucket/"
+        requested = []
+
+        class DummyResponse(io.BytesIO):
+            status = 200
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, exc_type, exc, tb):
+                self.close()
+
+        def fake_request(method, url, **kwargs):
+            requested.append(url)
+            if not url.startswith(working):
+                raise urllib.error.URLError("unreachable")
+            return DummyResponse()
+
+        with mock.patch("dig_open_data.backends._POOL.request", side_effect=fake_request):
+            self.assertTrue(backend.exists("s3://bucket/a.tsv.gz"))
+            requested.clear()
+            self.assertTrue(backend.exists("s3://bucket/b.tsv.gz"))
+
+        self.assertEqual(requested, [working + "b.tsv.gz"])
+
     def test_exists_false(self):
         backend = S3HttpBackend()
         error = urllib.error.HTTPError(
@@ -86,7 +271,7 @@ class TestS3Backend(unittest.TestCase):
             hdrs=None,
             fp=io.BytesIO(),
         )
-        with mock.patch("urllib.request.urlopen", side_effect=error):
+        with mock.patch("dig_open_data.backends._POOL.request", side_effect=error):
             self.assertFalse(
                 backend.exists("s3://dig-open-bottom-line-analysis/path/missing.tsv.gz")
             )
@@ -1,29 +1,29 @@
 from __future__ import annotations
 
+import io
 import unittest
+import urllib.error
 
+from dig_open_data.backends import _is_transient_http_error, _retry
 from dig_open_data.streams import open_text_stream_with_retries
 
 
 class FlakyTextStream:
     def __init__(self, data: str, fail_after: int | None = None) -> None:
-        self._data = data
-        self._pos = 0
+        self._buffer = io.StringIO(data)
         self._fail_after = fail_after
         self._failed = False
         self.closed = False
 
     def read(self, size: int | None = None) -> str:
-        if self._fail_after is not None and not self._failed and self._pos >= self._fail_after:
+        if (
+            self._fail_after is not None
+            and not self._failed
+            and self._buffer.tell() >= self._fail_after
+        ):
             self._failed = True
             raise EOFError("Simulated truncated stream")
-        if size is None or size < 0:
-            chunk = self._data[self._pos :]
-            self._pos = len(self._data)
-            return chunk
-        chunk = self._data[self._pos : self._pos + size]
-        self._pos += len(chunk)
-        return chunk
+        return self._buffer.read(size)
 
     def readline(self, *args, **kwargs) -> str:
         return self.read(*args, **kwargs)
@@ -53,5 +53,35 @@ class TestRetryingStream(unittest.TestCase):
         self.assertGreaterEqual(attempts["count"], 2)
 
 
+class TestRetryHelper(unittest.TestCase):
+    def test_retries_transient_then_succeeds(self):
+        calls = {"count": 0}
+
+        def flaky():
+            calls["count"] += 1
+            if calls["count"] < 3:
+                raise urllib.error.URLError("reset")
+            return "ok"
+
+        self.assertEqual(_retry(flaky, retries=2, transient=(urllib.error.URLError,)), "ok")
+        self.assertEqual(calls["count"], 3)
+
+    def test_permanent_error_not_retried(self):
+        calls = {"count": 0}
+
+        def missing():
+            calls["count"] += 1
+            raise urllib.error.HTTPError("https://example.com", 404, "Not Found", None, None)
+
+        with self.assertRaises(urllib.error.HTTPError):
+            _retry(
+                missing,
+                retries=3,
+                transient=(urllib.error.URLError,),
+                should_retry=_is_transient_http_error,
+            )
+        self.assertEqual(calls["count"], 1)
+
+
 if __name__ == "__main__":
     unittest.main()
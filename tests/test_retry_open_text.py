@@ -2,58 +2,69 @@ from __future__ import annotations
 
 import gzip
 import io
+import os
 import tempfile
+import time
 import unittest
 from unittest import mock
 
-from dig_open_data import CacheConfig, open_text
+from dig_open_data import (
+    CacheConfig,
+    fetch_many,
+    open_binary,
+    open_text,
+    refresh_env_config,
+)
 from dig_open_data.api import register_backend
+from dig_open_data.cache import cache_config_from_env
 
+from _fakes import (
+    BackendTestCase,
+    ConditionalBackend,
+    FakeBackend,
+    MemoryReader,
+    MetaBackend,
+    RangeBackend,
+    gz,
+)
 
-class FakeBackend:
-    schemes = {"fake"}
+LINES = ["col1\tcol2\n", "1\t2\n", "3\t4\n", "5\t6\n", "7\t8\n"]
+PAYLOAD = gz("".join(LINES).encode("utf-8"))
+TRUNCATED_PAYLOAD = PAYLOAD[:-10]
+LARGE_LINES = [f"{i}\tvalue{i}\n" for i in range(5000)]
+LARGE_PAYLOAD = gz("".join(LARGE_LINES).encode("utf-8"))
+PAYLOAD_A = gz(b"a\n")
+PAYLOAD_B = gz(b"b\n")
 
-    def __init__(self, payloads: list[bytes]) -> None:
-        self._payloads = payloads
-        self.calls = 0
 
-    def open_binary(self, uri: str) -> io.BytesIO:
-        self.calls += 1
-        index = min(self.calls - 1, len(self._payloads) - 1)
-        return io.BytesIO(self._payloads[index])
+class CacheDirTestCase(BackendTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls._tmp = tempfile.TemporaryDirectory()
 
-    def exists(self, uri: str) -> bool:
-        return True
+    @classmethod
+    def tearDownClass(cls):
+        cls._tmp.cleanup()
 
+    def make_cache_dir(self) -> str:
+        path = os.path.join(self._tmp.name, self._testMethodName)
+        os.mkdir(path)
+        return path
 
-class TestOpenTextRetries(unittest.TestCase):
-    def test_retry_on_truncated_gzip(self):
-        lines = [
-            "col1\tcol2\n",
-            "1\t2\n",
-            "3\t4\n",
-            "5\t6\n",
-            "7\t8\n",
-        ]
-        content = "".join(lines).encode("utf-8")
-        full_payload = gzip.compress(content)
-        truncated_payload = full_payload[:-10]
 
-        backend = FakeBackend([truncated_payload, full_payload])
+class TestOpenTextRetries(BackendTestCase):
+    def test_retry_on_truncated_gzip(self):
+        backend = FakeBackend([TRUNCATED_PAYLOAD, PAYLOAD])
         register_backend(backend)
 
         with open_text("fake://object", retries=2) as handle:
             read_lines = list(handle)
 
-        self.assertEqual(read_lines, lines)
+        self.assertEqual(read_lines, LINES)
         self.assertEqual(backend.calls, 2)
 
     def test_retry_exhausted(self):
-        content = "col1\tcol2\n1\t2\n".encode("utf-8")
-        full_payload = gzip.compress(content)
-        truncated_payload = full_payload[:-10]
-
-        backend = FakeBackend([truncated_payload, truncated_payload])
+        backend = FakeBackend([TRUNCATED_PAYLOAD, TRUNCATED_PAYLOAD])
         register_backend(backend)
 
         with self.assertRaises((gzip.BadGzipFile, EOFError, OSError)):
@@ -61,14 +72,173 @@ class TestOpenTextRetries(unittest.TestCase):
                 _ = handle.read()
 
 
-class TestCacheConfigEnv(unittest.TestCase):
+class TestRangedDownload(BackendTestCase):
+    def test_ranged_download_reassembles_parts(self):
+        backend = RangeBackend(LARGE_PAYLOAD)
+        register_backend(backend)
+
+        with mock.patch("dig_open_data.api._RANGED_THRESHOLD", 1024), mock.patch(
+            "dig_open_data.api._RANGED_PART_SIZE", 1000
+        ):
+            with open_text("fake://object", download=True, retries=0) as handle:
+                read_lines = list(handle)
+
+        self.assertEqual(read_lines, LARGE_LINES)
+        self.assertEqual(len(backend.ranges), -(-len(LARGE_PAYLOAD) // 1000) - 1)
+        self.assertEqual(backend.calls, len(backend.ranges) + 1)
+        self.assertEqual(backend.head_calls, 0)
+
+    def test_small_download_is_a_single_get(self):
+        backend = RangeBackend(PAYLOAD)
+        register_backend(backend)
+
+        with open_text("fake://object", download=True, retries=0) as handle:
+            read_lines = list(handle)
+
+        self.assertEqual(read_lines, LINES)
+        self.assertEqual(backend.calls, 1)
+        self.assertEqual(backend.ranges, [])
+        self.assertEqual(backend.head_calls, 0)
+
+
+CUT = len(LARGE_PAYLOAD) // 2
+
+
+class DroppingStream(io.BytesIO):
+    def readinto(self, buffer):
+        if self.tell() >= CUT:
+            raise ConnectionResetError("connection dropped")
+        view = memoryview(buffer)[: CUT - self.tell()]
+        return super().readinto(view)
+
+
+class DroppingRangeBackend(RangeBackend):
+    def open_binary(self, uri: str, *, headers: dict | None = None):
+        if headers is None:
+            self.calls += 1
+            return DroppingStream(self._payload)
+        self.calls += 1
+        self.ranges.append(headers["Range"])
+        response = MemoryReader(memoryview(self._payload)[int(headers["Range"][6:-1]) :])
+        response.status = 206
+        return response
+
+
+class DroppingBackend(FakeBackend):
+    def open_binary(self, uri: str):
+        self.calls += 1
+        if self.calls == 1:
+            return DroppingStream(self._payloads[0])
+        return MemoryReader(self._payloads[0])
+
+
+def _readinto_all(handle) -> bytes:
+    buffer = bytearray(4096)
+    parts = []
+    while True:
+        count = handle.readinto(buffer)
+        if not count:
+            return b"".join(parts)
+        parts.append(bytes(buffer[:count]))
+
+
+class TestResumeWithRange(BackendTestCase):
+    def test_dropped_connection_resumes_from_offset(self):
+        backend = DroppingRangeBackend(LARGE_PAYLOAD)
+        register_backend(backend)
+
+        with open_text("fake://object", retries=2) as handle:
+            read_lines = list(handle)
+
+        self.assertEqual(read_lines, LARGE_LINES)
+        self.assertEqual(backend.ranges, [f"bytes={CUT}-"])
+        self.assertEqual(backend.calls, 2)
+
+    def test_exhausted_resume_budget_is_not_retried_again(self):
+        class AlwaysDroppingRangeBackend(RangeBackend):
+            def open_binary(self, uri: str, *, headers: dict | None = None):
+                self.calls += 1
+                if headers is None:
+                    return DroppingStream(self._payload)
+                self.ranges.append(headers["Range"])
+                raise ConnectionResetError("connection dropped")
+
+        backend = AlwaysDroppingRangeBackend(LARGE_PAYLOAD)
+        register_backend(backend)
+
+        with self.assertRaises(ConnectionResetError):
+            with open_text("fake://object", retries=2) as handle:
+                list(handle)
+
+        self.assertEqual(backend.calls, 3)
+        self.assertEqual(backend.ranges, [f"bytes={CUT}-"] * 2)
+
+
+class TestOpenBinaryRetries(BackendTestCase):
+    def test_readinto_resumes_across_dropped_connection(self):
+        for backend in (DroppingRangeBackend(LARGE_PAYLOAD), DroppingBackend([LARGE_PAYLOAD])):
+            with self.subTest(backend=type(backend).__name__):
+                register_backend(backend)
+
+                with open_binary("fake://object", retries=2) as handle:
+                    self.assertTrue(handle.readable())
+                    data = _readinto_all(handle)
+
+                self.assertEqual(data, LARGE_PAYLOAD)
+                self.assertEqual(backend.calls, 2)
+
+    def test_readinto_decompressed_resumes_across_dropped_connection(self):
+        backend = DroppingBackend([LARGE_PAYLOAD])
+        register_backend(backend)
+
+        with open_binary("fake://object", retries=2, decompress=True) as handle:
+            data = _readinto_all(handle)
+
+        self.assertEqual(data.decode("utf-8").splitlines(True), LARGE_LINES)
+
+
+class TestOpenBinaryCached(CacheDirTestCase):
+    def test_open_binary_reads_cached_bytes(self):
+        backend = FakeBackend([PAYLOAD_A])
+        register_backend(backend)
+
+        tmpdir = self.make_cache_dir()
+        cache = CacheConfig(dir=tmpdir, max_bytes=1024 * 1024)
+        with open_binary("fake://object", cache=cache, retries=0) as handle:
+            first = handle.read()
+        with open_binary("fake://object", cache=cache, retries=0) as handle:
+            second = handle.read()
+
+        self.assertEqual(first, PAYLOAD_A)
+        self.assertEqual(second, PAYLOAD_A)
+        self.assertEqual(backend.calls, 1)
+
+
+class TestPipelinedDownload(BackendTestCase):
+    def test_pipelined_copy_preserves_content(self):
+        class SizedBackend(FakeBackend):
+            def open_binary(self, uri: str) -> MemoryReader:
+                response = super().open_binary(uri)
+                response.headers = {"Content-Length": str(len(LARGE_PAYLOAD))}
+                return response
+
+        register_backend(SizedBackend([LARGE_PAYLOAD]))
+        with mock.patch("dig_open_data.api._COPY_BUFFER_SIZE", 512), mock.patch(
+            "dig_open_data.api._PIPELINE_THRESHOLD", 1024
+        ):
+            with open_text("fake://object", download=True, retries=0) as handle:
+                read_lines = list(handle)
+
+        self.assertEqual(read_lines, LARGE_LINES)
+
+
+class TestCacheConfigEnv(CacheDirTestCase):
     def test_cache_env_fallback(self):
-        content = "col1\tcol2\n1\t2\n".encode("utf-8")
-        payload = gzip.compress(content)
-        backend = FakeBackend([payload])
+        backend = FakeBackend([PAYLOAD])
         register_backend(backend)
 
-        with tempfile.TemporaryDirectory() as tmpdir:
+        tmpdir = self.make_cache_dir()
+        try:
             with mock.patch.dict(
                 "os.environ",
                 {
@@ -77,40 +247,156 @@ class TestCacheConfigEnv(unittest.TestCase):
                 },
                 clear=False,
             ):
+                refresh_env_config()
+                self.assertEqual(cache_config_from_env().max_bytes, 1024 * 1024)
                 with open_text("fake://object", retries=0) as handle:
                     data = handle.read()
+        finally:
+            refresh_env_config()
         self.assertIn("col1", data)
+        self.assertEqual(backend.calls, 1)
+
+    def test_cache_env_max_bytes_accepts_suffixes(self):
+        tmpdir = self.make_cache_dir()
+        for value, expected in (("1MiB", 1024 * 1024), ("512k", 512 * 1024), ("2G", 2 * 1024**3)):
+            with self.subTest(value=value):
+                try:
+                    with mock.patch.dict(
+                        "os.environ",
+                        {
+                            "DIG_OPEN_DATA_CACHE_DIR": tmpdir,
+                            "DIG_OPEN_DATA_CACHE_MAX_BYTES": value,
+                        },
+                        clear=False,
+                    ):
+                        refresh_env_config()
+                        self.assertEqual(cache_config_from_env().max_bytes, expected)
+                finally:
+                    refresh_env_config()
 
 
-class TestCacheRefresh(unittest.TestCase):
+class TestCacheRefresh(CacheDirTestCase):
     def test_cache_refresh_forces_redownload(self):
-        content1 = gzip.compress(b"a\n")
-        content2 = gzip.compress(b"b\n")
+        backend = MetaBackend([PAYLOAD_A, PAYLOAD_B], ["etag1", "etag2"])
+        register_backend(backend)
+
+        tmpdir = self.make_cache_dir()
+        cache = CacheConfig(dir=tmpdir, max_bytes=1024 * 1024)
+        with open_text("fake://object", cache=cache, retries=0) as handle:
+            first = handle.read()
+        with open_text(
+            "fake://object", cache=cache, retries=0, cache_refresh=True
+        ) as handle:
+            second = handle.read()
+
+        self.assertNotEqual(first, second)
+
+    def test_cache_force_env_after_refresh(self):
+        backend = FakeBackend([PAYLOAD_A])
+        register_backend(backend)
+
+        tmpdir = self.make_cache_dir()
+        cache = CacheConfig(dir=tmpdir, max_bytes=1024 * 1024)
+        try:
+            with mock.patch.dict("os.environ", {"DIG_OPEN_DATA_CACHE_FORCE": "1"}):
+                refresh_env_config()
+                for _ in range(2):
+                    with open_text("fake://object", cache=cache, retries=0) as handle:
+                        handle.read()
+        finally:
+            refresh_env_config()
+
+        self.assertEqual(backend.calls, 2)
 
-        class MetaBackend(FakeBackend):
-            def __init__(self, payloads, etags):
+    def test_head_metadata_cached_within_process(self):
+        class HeadCountingBackend(FakeBackend):
+            def __init__(self, payloads):
                 super().__init__(payloads)
-                self._etags = etags
-                self._head_calls = 0
+                self.head_calls = 0
 
             def head_metadata(self, uri: str) -> dict:
-                self._head_calls += 1
-                index = min(self.calls, len(self._etags) - 1)
-                return {"etag": self._etags[index], "last_modified": f"t{index}"}
+                self.head_calls += 1
+                return {"content_length": len(self._payloads[0])}
 
-        backend = MetaBackend([content1, content2], ["etag1", "etag2"])
+        backend = HeadCountingBackend([PAYLOAD_A])
         register_backend(backend)
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            cache = CacheConfig(dir=tmpdir, max_bytes=1024 * 1024)
+        tmpdir = self.make_cache_dir()
+        cache = CacheConfig(dir=tmpdir, max_bytes=1024 * 1024)
+        for _ in range(3):
             with open_text("fake://object", cache=cache, retries=0) as handle:
-                first = handle.read()
-            with open_text(
-                "fake://object", cache=cache, retries=0, cache_refresh=True
-            ) as handle:
-                second = handle.read()
+                handle.read()
 
-        self.assertNotEqual(first, second)
+        self.assertEqual(backend.calls, 1)
+        self.assertEqual(backend.head_calls, 1)
+
+    def test_concurrent_opens_share_one_download(self):
+        class SlowBackend(FakeBackend):
+            def open_binary(self, uri: str) -> MemoryReader:
+                time.sleep(0.1)
+                return super().open_binary(uri)
+
+        backend = SlowBackend([PAYLOAD_A])
+        register_backend(backend)
+
+        tmpdir = self.make_cache_dir()
+        cache = CacheConfig(dir=tmpdir, max_bytes=1024 * 1024)
+        handles = fetch_many(["fake://object"] * 4, cache=cache, retries=0)
+        contents = []
+        for handle in handles:
+            with handle:
+                contents.append(handle.read())
+
+        self.assertEqual(contents, ["a\n"] * 4)
+        self.assertEqual(backend.calls, 1)
+
+    def test_conditional_get_reuses_cache_on_304(self):
+        backend = ConditionalBackend(PAYLOAD_A)
+        register_backend(backend)
+
+        tmpdir = self.make_cache_dir()
+        cache = CacheConfig(dir=tmpdir, max_bytes=1024 * 1024)
+        with open_text("fake://object", cache=cache, retries=0) as handle:
+            first = handle.read()
+        with open_text("fake://object", cache=cache, retries=0) as handle:
+            second = handle.read()
+
+        self.assertEqual(first, second)
+        self.assertEqual(backend.calls, 1)
+        self.assertEqual(backend.conditional_headers, [{"If-None-Match": "\"etag1\""}])
+
+    def test_conditional_get_revalidates_once_per_ttl(self):
+        backend = ConditionalBackend(PAYLOAD_A)
+        register_backend(backend)
+
+        cache = CacheConfig(dir=self.make_cache_dir(), max_bytes=1024 * 1024)
+        for _ in range(5):
+            with open_text("fake://object", cache=cache, retries=0) as handle:
+                self.assertEqual(handle.read(), "a\n")
+
+        self.assertEqual(backend.calls, 1)
+        self.assertEqual(len(backend.conditional_headers), 1)
+
+        with mock.patch("dig_open_data.api._HEAD_TTL_SECONDS", 0):
+            with open_text("fake://object", cache=cache, retries=0) as handle:
+                handle.read()
+        self.assertEqual(len(backend.conditional_headers), 2)
+
+    def test_missing_cached_file_redownloads(self):
+        backend = FakeBackend([PAYLOAD_A])
+        register_backend(backend)
+
+        tmpdir = self.make_cache_dir()
+        cache = CacheConfig(dir=tmpdir, max_bytes=1024 * 1024)
+        with open_text("fake://object", cache=cache, retries=0) as handle:
+            handle.read()
+        for name in os.listdir(os.path.join(tmpdir, "objects")):
+            os.remove(os.path.join(tmpdir, "objects", name))
+        with open_text("fake://object", cache=cache, retries=0) as handle:
+            second = handle.read()
+
+        self.assertEqual(second, "a\n")
+        self.assertEqual(backend.calls, 2)
 
 
 if __name__ == "__main__":